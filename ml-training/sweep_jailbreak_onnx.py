@@ -0,0 +1,167 @@
+"""
+Hyperparameter sweep for the tiny jailbreak classifier.
+
+Trains every combination of the grid in a process pool (one CPU thread per
+worker), exports each candidate to ONNX, then benchmarks the candidates one at
+a time with onnxruntime so timings are not skewed by concurrent training.
+Writes sweep_report.json / sweep_report.csv with accuracy, single and batched
+latency, model size, and whether each candidate is on the Pareto front.
+
+    python sweep_jailbreak_onnx.py --vocab-size 4096 8192 --embed-dim 32 64 \
+        --max-len 48 64 --epochs 6 12 --workers 4
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import torch
+
+from train_jailbreak_onnx_from_csv import export_onnx, load_training_texts, split_training_texts, train_model
+
+try:
+    from safellmkit.ml.benchmark import benchmark_onnx, pareto_front
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "safellmkit-python"))
+    from safellmkit.ml.benchmark import benchmark_onnx, pareto_front
+
+DEFAULT_CSVS = [
+    "jailbreak_prompts.csv",
+    "malicous_deepset.csv",
+    "forbidden_question_set_df.csv",
+    "forbidden_question_set_with_prompts.csv",
+    "predictionguard_df.csv"
+]
+
+_DATA = None
+
+
+def _init_worker(data):
+    # Workers share the CPU; one intra-op thread each avoids oversubscription
+    global _DATA
+    _DATA = data
+    torch.set_num_threads(1)
+
+
+def _train_candidate(config, out_dir, batch_size):
+    X_train, X_test, y_train, y_test = _DATA
+    name = "v{vocab_size}_d{embed_dim}_l{max_len}_e{epochs}".format(**config)
+    model, metrics = train_model(
+        X_train, y_train, X_test, y_test,
+        batch_size=batch_size,
+        verbose=False,
+        **config
+    )
+    # Keep the default basename so the `.onnx.data` external-data reference stays valid
+    candidate_dir = os.path.join(out_dir, name)
+    os.makedirs(candidate_dir, exist_ok=True)
+    out_path = os.path.join(candidate_dir, "jailbreak_classifier.onnx")
+    export_onnx(model, max_len=config["max_len"], vocab_size=config["vocab_size"], out_path=out_path)
+    return {"name": name, **config, **metrics, "model": out_path}
+
+
+def run_sweep(
+    jailbreak_csv_paths,
+    grid,
+    out_dir="sweeps",
+    workers=None,
+    batch_size=32,
+    bench_texts=512,
+    bench_batch_size=64
+):
+    texts, labels = load_training_texts(jailbreak_csv_paths)
+    if not texts:
+        print("❌ No jailbreak data found. Please add csv files to the folder.")
+        return []
+    X_train, X_test, y_train, y_test = split_training_texts(texts, labels)
+
+    keys = list(grid)
+    configs = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    workers = workers or min(len(configs), os.cpu_count() or 1)
+    print(f"⏳ Training {len(configs)} candidates on {workers} worker(s)...")
+
+    rows = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=((X_train, X_test, y_train, y_test),)
+    ) as pool:
+        futures = {pool.submit(_train_candidate, config, out_dir, batch_size): config for config in configs}
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except Exception as e:
+                print(f"❌ Candidate {futures[future]} failed: {e}")
+                continue
+            print(f"✅ {row['name']}: accuracy {row['accuracy']:.4f} ({row['train_seconds']:.0f}s)")
+            rows.append(row)
+
+    # Benchmark sequentially on held-out prompts, so latency reflects real input lengths
+    sample = list(X_test[:bench_texts])
+    sample_labels = list(y_test[:bench_texts])
+    for row in rows:
+        bench = benchmark_onnx(row["model"], sample, sample_labels, batch_size=bench_batch_size)
+        row.update({k: v for k, v in bench.items() if k not in ("model", "accuracy")})
+        row["onnx_accuracy"] = bench["accuracy"]
+
+    front = {row["name"] for row in pareto_front(rows)}
+    for row in rows:
+        row["pareto"] = row["name"] in front
+    rows.sort(key=lambda row: (not row["pareto"], -row["accuracy"], row["single_p95_ms"]))
+    write_report(rows, out_dir)
+    return rows
+
+
+def write_report(rows, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "sweep_report.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+    if rows:
+        with open(os.path.join(out_dir, "sweep_report.csv"), "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+    print("\n✅ Pareto front (accuracy vs. p95 latency vs. size):")
+    for row in rows:
+        if row["pareto"]:
+            print(
+                f"  {row['name']}: accuracy {row['accuracy']:.4f} | "
+                f"single p95 {row['single_p95_ms']:.2f} ms | "
+                f"batch({row['batch_size']}) p95 {row['batch_p95_ms']:.2f} ms | "
+                f"{row['size_bytes'] / 1e6:.1f} MB"
+            )
+    print(f"\nReport: {os.path.abspath(os.path.join(out_dir, 'sweep_report.json'))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep jailbreak classifier hyperparameters")
+    parser.add_argument("--csv", nargs="+", default=DEFAULT_CSVS, help="Jailbreak prompt CSVs")
+    parser.add_argument("--vocab-size", nargs="+", type=int, default=[4096, 8192])
+    parser.add_argument("--embed-dim", nargs="+", type=int, default=[32, 64])
+    parser.add_argument("--max-len", nargs="+", type=int, default=[48, 64])
+    parser.add_argument("--epochs", nargs="+", type=int, default=[6, 12])
+    parser.add_argument("--batch-size", type=int, default=32, help="Training batch size")
+    parser.add_argument("--workers", type=int, default=None, help="Training processes (default: CPU count)")
+    parser.add_argument("--out-dir", default="sweeps")
+    parser.add_argument("--bench-texts", type=int, default=512, help="Held-out prompts used for benchmarking")
+    parser.add_argument("--bench-batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    run_sweep(
+        args.csv,
+        {
+            "vocab_size": args.vocab_size,
+            "embed_dim": args.embed_dim,
+            "max_len": args.max_len,
+            "epochs": args.epochs,
+        },
+        out_dir=args.out_dir,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        bench_texts=args.bench_texts,
+        bench_batch_size=args.bench_batch_size
+    )
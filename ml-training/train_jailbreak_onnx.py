@@ -1,5 +1,4 @@
 import os
-import re
 import numpy as np
 import torch
 import torch.nn as nn
@@ -8,23 +7,23 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 
 # -----------------------------
-# 1) Simple tokenizer (MATCH SafeLLMKit SimpleHashTokenizer)
+# 1) Tokenizer (shared with the SafeLLMKit runtime)
 # -----------------------------
-def simple_hash_tokenize(text: str, max_len: int = 64, vocab_size: int = 8192):
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9\s]", " ", text).strip()
-    words = re.split(r"\s+", text)
-
-    input_ids = np.zeros(max_len, dtype=np.int64)
-    attention_mask = np.zeros(max_len, dtype=np.int64)
+try:
+    from safellmkit.ml.tokenizer import FnvHashTokenizer, stamp_tokenizer
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "safellmkit-python"))
+    from safellmkit.ml.tokenizer import FnvHashTokenizer, stamp_tokenizer
 
-    count = min(len(words), max_len)
-    for i in range(count):
-        h = hash(words[i])
-        idx = (abs(h) % vocab_size) + 1  # 0 reserved for PAD
-        input_ids[i] = idx
-        attention_mask[i] = 1
+_TOKENIZERS = {}
 
+def simple_hash_tokenize(text: str, max_len: int = 64, vocab_size: int = 8192):
+    key = (vocab_size, max_len)
+    if key not in _TOKENIZERS:
+        _TOKENIZERS[key] = FnvHashTokenizer(vocab_size=vocab_size, max_len=max_len)
+    input_ids = _TOKENIZERS[key].tokenize(text)
+    attention_mask = (input_ids != 0).astype(np.int64)
     return input_ids, attention_mask
 
 # -----------------------------
@@ -192,6 +191,8 @@ def export_onnx(model, vocab_size=8192, max_len=64, out_path="jailbreak_classifi
         },
         opset_version=13
     )
+    # Lets OnnxJailbreakClassifier pick the matching tokenizer at load time
+    stamp_tokenizer(out_path, FnvHashTokenizer(vocab_size=vocab_size, max_len=max_len))
 
     print(f"\n✅ Exported ONNX model: {os.path.abspath(out_path)}")
 
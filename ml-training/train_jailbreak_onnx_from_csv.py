@@ -1,6 +1,5 @@
 import os
-import re
-import hashlib
+import time
 import pandas as pd
 import numpy as np
 import torch
@@ -10,30 +9,33 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 
 # -----------------------------
-# 1) SimpleHashTokenizer (MATCH SafeLLMKit - NOW STABLE MD5)
+# 1) Tokenizer (shared with the SafeLLMKit runtime)
 # -----------------------------
-def stable_hash(word: str) -> int:
-    # Use MD5, take first 8 hex chars = 32 bits.
-    # consistently matches Java/Kotlin logic if we implement same truncation.
-    # int(hex, 16) is a standard positive integer in Python.
-    hex_str = hashlib.md5(word.encode("utf-8")).hexdigest()
-    return int(hex_str[:8], 16)
-
-def simple_hash_tokenize(text: str, max_len: int = 64, vocab_size: int = 8192):
-    text = str(text).lower()
-    text = re.sub(r"[^a-z0-9\s]", " ", text).strip()
-    words = re.split(r"\s+", text)
-
-    input_ids = np.zeros(max_len, dtype=np.int64)
-    attention_mask = np.zeros(max_len, dtype=np.int64)
-
-    count = min(len(words), max_len)
-    for i in range(count):
-        h = stable_hash(words[i])
-        idx = (h % vocab_size) + 1  # 0 reserved for PAD
-        input_ids[i] = idx
-        attention_mask[i] = 1
-
+try:
+    from safellmkit.ml.tokenizer import stamp_tokenizer, tokenizer_for
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "safellmkit-python"))
+    from safellmkit.ml.tokenizer import stamp_tokenizer, tokenizer_for
+
+# "fnv1a-v2" for new models. "md5-v1" serves legacy models but does not reproduce their
+# training: the old trainer replaced non-alphanumerics with spaces ("don't" -> "don", "t")
+# while the runtime md5-v1 tokenizer deletes them ("dont"), a known train/serve skew.
+# Retrain legacy models with "fnv1a-v2", which trains and serves with the same code.
+TOKENIZER_VERSION = "fnv1a-v2"
+
+_TOKENIZERS = {}
+
+def _tokenizer(version, vocab_size, max_len):
+    key = (version, vocab_size, max_len)
+    if key not in _TOKENIZERS:
+        _TOKENIZERS[key] = tokenizer_for(version, vocab_size=vocab_size, max_len=max_len)
+    return _TOKENIZERS[key]
+
+def simple_hash_tokenize(text: str, max_len: int = 64, vocab_size: int = 8192, version: str = TOKENIZER_VERSION):
+    tokenizer = _tokenizer(version, vocab_size, max_len)
+    input_ids = tokenizer.tokenize(str(text))
+    attention_mask = (input_ids != 0).astype(np.int64)
     return input_ids, attention_mask
 
 
@@ -285,7 +287,7 @@ def build_safe_examples(n: int):
 # -----------------------------
 # 5) Train + Export ONNX
 # -----------------------------
-def export_onnx(model, max_len=64, out_path="jailbreak_classifier.onnx"):
+def export_onnx(model, max_len=64, vocab_size=8192, out_path="jailbreak_classifier.onnx"):
     model.eval()
 
     dummy_input_ids = torch.zeros((1, max_len), dtype=torch.long)
@@ -304,17 +306,14 @@ def export_onnx(model, max_len=64, out_path="jailbreak_classifier.onnx"):
         },
         opset_version=13
     )
+    # Lets OnnxJailbreakClassifier pick the matching tokenizer at load time
+    stamp_tokenizer(out_path, _tokenizer(TOKENIZER_VERSION, vocab_size, max_len))
 
     print(f"\n✅ Exported ONNX model: {os.path.abspath(out_path)}")
 
 
-def train_from_csvs(
-    jailbreak_csv_paths,
-    out_model_path="jailbreak_classifier.onnx",
-    max_len=64,
-    vocab_size=8192,
-    epochs=10
-):
+def load_training_texts(jailbreak_csv_paths):
+    """(texts, labels) with jailbreak prompts from the CSVs and as many generated safe ones."""
     jailbreak_texts = []
     for p in jailbreak_csv_paths:
         jb = load_jailbreak_csv(p)
@@ -324,10 +323,9 @@ def train_from_csvs(
 
     jailbreak_texts = list(dict.fromkeys(jailbreak_texts))  # deduplicate
     print(f"✅ Total unique jailbreak samples: {len(jailbreak_texts)}")
-    
+
     if len(jailbreak_texts) == 0:
-        print("❌ No jailbreak data found. Please add csv files to the folder.")
-        return
+        return [], []
 
     # Build SAFE dataset same size
     print("⏳ generating safe examples...")
@@ -336,25 +334,44 @@ def train_from_csvs(
 
     texts = safe_texts + jailbreak_texts
     labels = [0] * len(safe_texts) + [1] * len(jailbreak_texts)
+    return texts, labels
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        texts, labels, test_size=0.2, random_state=42, stratify=labels
-    )
+
+def split_training_texts(texts, labels):
+    return train_test_split(texts, labels, test_size=0.2, random_state=42, stratify=labels)
+
+
+def train_model(
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    max_len=64,
+    vocab_size=8192,
+    embed_dim=64,
+    epochs=10,
+    batch_size=32,
+    seed=42,
+    verbose=True
+):
+    """Trains one configuration; returns (model, metrics) with held-out accuracy."""
+    torch.manual_seed(seed)
 
     train_ds = JailbreakDataset(X_train, y_train, max_len=max_len, vocab_size=vocab_size)
     test_ds = JailbreakDataset(X_test, y_test, max_len=max_len, vocab_size=vocab_size)
 
-    train_loader = DataLoader(train_ds, batch_size=32, shuffle=True)
-    test_loader = DataLoader(test_ds, batch_size=32, shuffle=False)
+    train_loader = DataLoader(train_ds, batch_size=batch_size, shuffle=True)
+    test_loader = DataLoader(test_ds, batch_size=batch_size, shuffle=False)
 
     device = torch.device("cpu")
 
-    model = TinyJailbreakClassifier(vocab_size=vocab_size).to(device)
+    model = TinyJailbreakClassifier(vocab_size=vocab_size, embed_dim=embed_dim).to(device)
     
     # ADDED WEIGHT DECAY to prevent overfitting
     optimizer = torch.optim.Adam(model.parameters(), lr=1e-3, weight_decay=1e-4)
     loss_fn = nn.CrossEntropyLoss()
 
+    train_start = time.perf_counter()
     for epoch in range(epochs):
         model.train()
         total_loss = 0.0
@@ -375,7 +392,9 @@ def train_from_csvs(
             total_loss += loss.item()
             step += 1
             
-        print(f"Epoch {epoch+1}/{epochs} | Loss: {total_loss:.4f}")
+        if verbose:
+            print(f"Epoch {epoch+1}/{epochs} | Loss: {total_loss:.4f}")
+    train_seconds = time.perf_counter() - train_start
 
     # Evaluate
     model.eval()
@@ -390,20 +409,53 @@ def train_from_csvs(
             all_preds.extend(preds)
             all_true.extend(y.cpu().numpy().tolist())
 
-    print("\n✅ Accuracy:", accuracy_score(all_true, all_preds))
-    print(classification_report(all_true, all_preds, target_names=["SAFE", "JAILBREAK"]))
-    
-    cm = confusion_matrix(all_true, all_preds)
-    print("\n✅ Confusion Matrix:")
-    try:
+    cm = confusion_matrix(all_true, all_preds, labels=[0, 1])
+    metrics = {
+        "accuracy": float(accuracy_score(all_true, all_preds)),
+        "true_negatives": int(cm[0][0]),
+        "false_positives": int(cm[0][1]),
+        "false_negatives": int(cm[1][0]),
+        "true_positives": int(cm[1][1]),
+        "train_seconds": train_seconds,
+    }
+
+    if verbose:
+        print("\n✅ Accuracy:", metrics["accuracy"])
+        print(classification_report(all_true, all_preds, target_names=["SAFE", "JAILBREAK"]))
+        print("\n✅ Confusion Matrix:")
         print(f"True SAFE (TN): {cm[0][0]} | False JAILBREAK (FP): {cm[0][1]}")
         print(f"False SAFE (FN): {cm[1][0]} | True JAILBREAK (TP): {cm[1][1]}")
-    except:
-        pass
-    print("\nArray view:\n", cm)
+        print("\nArray view:\n", cm)
 
+    return model, metrics
+
+
+def train_from_csvs(
+    jailbreak_csv_paths,
+    out_model_path="jailbreak_classifier.onnx",
+    max_len=64,
+    vocab_size=8192,
+    epochs=10,
+    embed_dim=64,
+    batch_size=32
+):
+    texts, labels = load_training_texts(jailbreak_csv_paths)
+    if not texts:
+        print("❌ No jailbreak data found. Please add csv files to the folder.")
+        return None
+
+    X_train, X_test, y_train, y_test = split_training_texts(texts, labels)
+    model, metrics = train_model(
+        X_train, y_train, X_test, y_test,
+        max_len=max_len,
+        vocab_size=vocab_size,
+        embed_dim=embed_dim,
+        epochs=epochs,
+        batch_size=batch_size
+    )
 
-    export_onnx(model, max_len=max_len, out_path=out_model_path)
+    export_onnx(model, max_len=max_len, vocab_size=vocab_size, out_path=out_model_path)
+    return metrics
 
 
 if __name__ == "__main__":
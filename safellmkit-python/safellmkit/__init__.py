@@ -1,6 +1,15 @@
 from .engine import GuardrailsEngine, StrictPolicy, RelaxedPolicy, Policy
 from .models import GuardrailResult, GuardrailAction, GuardrailFinding
-from .ml import OnnxJailbreakClassifier
+from .ml import OnnxJailbreakClassifier, CascadeClassifier, CascadeStage
+from .columnar import ColumnarResult, FindingsTable
+from .store import VerdictStore, CorpusScan
+from .replay import SignalBatch, SignalRecorder, replay
+from .shadow import ShadowEvaluator, ShadowDisagreement
+from .aggregate import RiskAggregator
+from .multipolicy import MultiPolicyEvaluator
+from .pool import EnginePool
+from .middleware import GuardrailsASGIMiddleware, GuardrailsWSGIMiddleware
+from .vault import PseudonymVault, PseudonymRestorer
 
 __all__ = [
     "GuardrailsEngine",
@@ -10,5 +19,23 @@ __all__ = [
     "GuardrailResult",
     "GuardrailAction",
     "GuardrailFinding",
-    "OnnxJailbreakClassifier"
+    "OnnxJailbreakClassifier",
+    "CascadeClassifier",
+    "CascadeStage",
+    "ColumnarResult",
+    "FindingsTable",
+    "VerdictStore",
+    "CorpusScan",
+    "SignalBatch",
+    "SignalRecorder",
+    "replay",
+    "ShadowEvaluator",
+    "ShadowDisagreement",
+    "RiskAggregator",
+    "MultiPolicyEvaluator",
+    "EnginePool",
+    "GuardrailsASGIMiddleware",
+    "GuardrailsWSGIMiddleware",
+    "PseudonymVault",
+    "PseudonymRestorer"
 ]
@@ -0,0 +1,176 @@
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .models import GuardrailAction, GuardrailFinding, GuardrailResult
+
+AGGREGATE_CATEGORY = "RISK_AGGREGATION"
+
+
+class WindowedCountMin:
+    """
+    Count-min sketch over a sliding window: a ring of `buckets` sketches, each
+    covering window/buckets seconds, plus their running sum so an estimate reads
+    only `depth` counters. Memory is fixed by (buckets, depth, width) regardless of
+    how many keys are seen; estimates never undercount.
+    """
+
+    def __init__(self, window_seconds: float, buckets: int, width: int, depth: int, clock: Callable[[], float]):
+        self.bucket_seconds = window_seconds / buckets
+        self.width = width
+        self.depth = depth
+        self.clock = clock
+        self.counts = np.zeros((buckets, depth * width), dtype=np.uint32)
+        self.total = np.zeros(depth * width, dtype=np.uint64)
+        # Scalar access through memoryviews avoids numpy's per-call overhead
+        self._counts = [memoryview(row) for row in self.counts]
+        self._total = memoryview(self.total)
+        self._epoch = int(clock() / self.bucket_seconds)
+
+    def _cells(self, key: str) -> List[int]:
+        # Double hashing: one flat cell per row from a single 128-bit digest
+        digest = hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def _advance(self) -> int:
+        epoch = int(self.clock() / self.bucket_seconds)
+        buckets = len(self.counts)
+        if epoch != self._epoch:
+            # Expire every bucket the clock moved past (all of them after a long gap)
+            for e in range(self._epoch + 1, min(epoch, self._epoch + buckets) + 1):
+                expired = self.counts[e % buckets]
+                self.total -= expired
+                expired[:] = 0
+            self._epoch = epoch
+        return epoch % buckets
+
+    def add(self, key: str, amount: int) -> int:
+        """Adds `amount` to `key` and returns its new windowed estimate."""
+        bucket = self._counts[self._advance()]
+        total = self._total
+        estimate = None
+        for cell in self._cells(key):
+            bucket[cell] = min(bucket[cell] + amount, 0xFFFFFFFF)
+            total[cell] += amount
+            estimate = total[cell] if estimate is None else min(estimate, total[cell])
+        return int(estimate)
+
+    def estimate(self, key: str) -> int:
+        self._advance()
+        total = self._total
+        return int(min(total[cell] for cell in self._cells(key)))
+
+
+class RiskAggregator:
+    """
+    Per-key (user, tenant, IP...) sliding-window risk across requests, in constant
+    memory: windowed count-min sketches of summed risk scores and of per-category
+    finding counts, plus a top-k list of the riskiest keys. A key whose windowed
+    risk reaches `escalate_at` is escalated: its verdicts with findings (allowed or
+    sanitized) are blocked. Allowed findings are not escalated to SANITIZE, since
+    the policy's sanitize-mode rules have already rewritten safe_text and the rest
+    cannot be sanitized.
+    """
+
+    def __init__(
+        self,
+        escalate_at: int = 300,
+        window_seconds: float = 600.0,
+        buckets: int = 10,
+        width: int = 1 << 15,
+        depth: int = 4,
+        top_k: int = 100,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.escalate_at = escalate_at
+        self.top_k = top_k
+        self.risk = WindowedCountMin(window_seconds, buckets, width, depth, clock)
+        self.categories = WindowedCountMin(window_seconds, buckets, width, depth, clock)
+        self._top: Dict[str, int] = {}
+        self._floor: Optional[str] = None
+        self._top_epoch = self.risk._epoch
+        self._lock = threading.Lock()
+        self.escalations = 0
+
+    def observe(self, key: str, result: GuardrailResult) -> int:
+        """Records one verdict for `key`; returns the key's windowed risk."""
+        with self._lock:
+            score = self.risk.add(key, result.risk_score)
+            if result.findings:
+                for category in {f.category for f in result.findings}:
+                    self.categories.add(f"{key}\x00{category}", 1)
+            self._track(key, score)
+        return score
+
+    def _refresh_top(self) -> None:
+        # Re-estimate candidates once per bucket rotation so expired keys make room
+        self._top = {k: s for k, s in ((k, self.risk.estimate(k)) for k in self._top) if s > 0}
+        self._floor = None
+        self._top_epoch = self.risk._epoch
+
+    def _track(self, key: str, score: int) -> None:
+        # Top-k candidates by last seen estimate; `_floor` caches the weakest entry
+        if self.risk._epoch != self._top_epoch:
+            self._refresh_top()
+        top = self._top
+        if key in top or len(top) < self.top_k:
+            top[key] = score
+            self._floor = None
+            return
+        if self._floor is None:
+            self._floor = min(top, key=top.get)
+        if score > top[self._floor]:
+            del top[self._floor]
+            top[key] = score
+            self._floor = None
+
+    def score(self, key: str) -> int:
+        with self._lock:
+            return self.risk.estimate(key)
+
+    def category_count(self, key: str, category: str) -> int:
+        with self._lock:
+            return self.categories.estimate(f"{key}\x00{category}")
+
+    def is_escalated(self, key: str) -> bool:
+        return self.score(key) >= self.escalate_at
+
+    def heavy_hitters(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Riskiest tracked keys with their current windowed risk, highest first."""
+        with self._lock:
+            self._refresh_top()
+            current = list(self._top.items())
+        current.sort(key=lambda item: item[1], reverse=True)
+        return current[:n or self.top_k]
+
+    def apply(self, key: str, result: GuardrailResult) -> GuardrailResult:
+        """Observes `result` and returns it, made stricter if `key` is escalated."""
+        score = self.observe(key, result)
+        if score < self.escalate_at:
+            return result
+        if result.action == GuardrailAction.SANITIZE or result.findings:
+            action = GuardrailAction.BLOCK
+        else:
+            action = result.action
+        with self._lock:
+            self.escalations += 1
+        finding = GuardrailFinding(
+            category=AGGREGATE_CATEGORY,
+            rule="RiskAggregator",
+            severity=min(10, score * 10 // max(self.escalate_at, 1)),
+            message=f"Key exceeded windowed risk threshold ({score} >= {self.escalate_at})"
+        )
+        escalated = result.model_copy(update={"action": action, "findings": [*result.findings, finding]})
+        if action == GuardrailAction.BLOCK:
+            escalated.safe_text = None
+            escalated.message_to_user = "Input blocked by security policy."
+        return escalated
+
+    def memory_bytes(self) -> int:
+        return sum(s.counts.nbytes + s.total.nbytes for s in (self.risk, self.categories))
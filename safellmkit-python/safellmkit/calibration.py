@@ -0,0 +1,167 @@
+import csv
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+TEXT_COLUMNS = ["prompt", "text", "content", "instruction", "query", "jailbreak_prompt"]
+LABEL_COLUMNS = ["label", "is_jailbreak", "jailbreak", "target", "y"]
+POSITIVE_LABELS = {"1", "true", "yes", "jailbreak", "unsafe", "malicious", "attack"}
+NEGATIVE_LABELS = {"0", "false", "no", "safe", "benign"}
+
+
+def load_labeled_csv(
+    path: str,
+    text_column: Optional[str] = None,
+    label_column: Optional[str] = None
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Reads (texts, labels) from a CSV; label 1 = jailbreak. Columns are detected
+    from common names unless given. Rows with empty text or unknown labels are skipped.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        text_column = text_column or next((c for c in TEXT_COLUMNS if c in fields), None)
+        label_column = label_column or next((c for c in LABEL_COLUMNS if c in fields), None)
+        if text_column is None or label_column is None:
+            raise ValueError(f"Could not find text/label columns in {path}: {fields}")
+
+        texts: List[str] = []
+        labels: List[int] = []
+        for row in reader:
+            text = row.get(text_column) or ""
+            label = (row.get(label_column) or "").strip().lower()
+            if not text or label not in POSITIVE_LABELS | NEGATIVE_LABELS:
+                continue
+            texts.append(text)
+            labels.append(1 if label in POSITIVE_LABELS else 0)
+    return texts, np.asarray(labels, dtype=np.int8)
+
+
+def score_texts(classifier, texts: List[str], cache_dir: Optional[str] = None) -> np.ndarray:
+    """
+    Scores `texts` in one batched pass. With `cache_dir`, probabilities are cached
+    under a key of the classifier fingerprint and the texts, so re-running a
+    calibration with other targets costs no inference.
+    """
+    cache_path = None
+    if cache_dir:
+        digest = hashlib.sha256()
+        fingerprint = getattr(classifier, "fingerprint", None)
+        digest.update((fingerprint() if fingerprint else type(classifier).__qualname__).encode("utf-8"))
+        for text in texts:
+            digest.update(hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+        cache_path = os.path.join(cache_dir, f"scores-{digest.hexdigest()[:32]}.npy")
+        if os.path.exists(cache_path):
+            return np.load(cache_path)
+
+    probabilities = classifier.predict_batch(texts)
+    if probabilities is None:
+        raise RuntimeError("Classifier is unavailable; cannot score calibration data")
+    probabilities = np.asarray(probabilities, dtype=np.float32)
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.save(cache_path, probabilities)
+    return probabilities
+
+
+class ThresholdCurve:
+    """
+    Every operating point of `probability >= threshold`, computed from a single
+    sort: one entry per distinct score, thresholds descending.
+    """
+
+    def __init__(self, probabilities: np.ndarray, labels: np.ndarray):
+        order = np.argsort(-probabilities, kind="stable")
+        scores = probabilities[order].astype(np.float64)
+        truth = labels[order].astype(np.int64)
+        # Last index of each run of equal scores
+        last = np.flatnonzero(np.r_[np.diff(scores) != 0, True])
+        tp = np.cumsum(truth)[last]
+        fp = np.cumsum(1 - truth)[last]
+        self.positives = int(truth.sum())
+        self.negatives = int(len(truth) - self.positives)
+
+        self.thresholds = scores[last]
+        self.tp = tp
+        self.fp = fp
+        self.tpr = tp / max(self.positives, 1)
+        self.fpr = fp / max(self.negatives, 1)
+        self.precision = tp / np.maximum(tp + fp, 1)
+        self.recall = self.tpr
+
+    @property
+    def roc_auc(self) -> float:
+        fpr = np.r_[0.0, self.fpr]
+        tpr = np.r_[0.0, self.tpr]
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+    @property
+    def average_precision(self) -> float:
+        recall = np.r_[0.0, self.recall]
+        return float(np.sum(np.diff(recall) * self.precision))
+
+    def at_fpr(self, target_fpr: float) -> Dict[str, float]:
+        """Lowest threshold (highest recall) whose false-positive rate stays <= target."""
+        ok = np.flatnonzero(self.fpr <= target_fpr)
+        if len(ok) == 0:
+            # Nothing qualifies: only flag scores above the top observed one
+            return {"threshold": float(np.nextafter(self.thresholds[0], np.inf)),
+                    "precision": 1.0, "recall": 0.0, "fpr": 0.0}
+        i = ok[-1]
+        return {
+            "threshold": float(self.thresholds[i]),
+            "precision": float(self.precision[i]),
+            "recall": float(self.recall[i]),
+            "fpr": float(self.fpr[i]),
+        }
+
+    def points(self, max_points: int = 200) -> List[Dict[str, float]]:
+        idx = np.unique(np.linspace(0, len(self.thresholds) - 1, min(max_points, len(self.thresholds))).astype(int))
+        return [
+            {
+                "threshold": float(self.thresholds[i]),
+                "precision": float(self.precision[i]),
+                "recall": float(self.recall[i]),
+                "fpr": float(self.fpr[i]),
+            }
+            for i in idx
+        ]
+
+
+def calibrate(
+    probabilities: np.ndarray,
+    labels: np.ndarray,
+    block_fpr: float = 0.01,
+    sanitize_fpr: float = 0.05
+) -> Dict:
+    """Returns a report with curves, summary metrics and recommended ml_thresholds."""
+    if labels.min(initial=1) == labels.max(initial=0):
+        raise ValueError("Calibration data needs both jailbreak and safe examples")
+    curve = ThresholdCurve(probabilities, labels)
+    block = curve.at_fpr(block_fpr)
+    sanitize = curve.at_fpr(sanitize_fpr)
+    # SANITIZE must never be stricter than BLOCK
+    sanitize_threshold = min(sanitize["threshold"], block["threshold"])
+    return {
+        "samples": int(len(labels)),
+        "positives": curve.positives,
+        "negatives": curve.negatives,
+        "roc_auc": curve.roc_auc,
+        "average_precision": curve.average_precision,
+        "block": {**block, "target_fpr": block_fpr},
+        "sanitize": {**sanitize, "threshold": sanitize_threshold, "target_fpr": sanitize_fpr},
+        "ml_thresholds": {"block": block["threshold"], "sanitize": sanitize_threshold},
+        "curve": curve.points(),
+    }
+
+
+def write_policy(base_config: dict, ml_thresholds: Dict[str, float], path: str) -> dict:
+    config = {**base_config, "ml_thresholds": {k: round(v, 6) for k, v in ml_thresholds.items()}}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=4)
+    return config
@@ -1,21 +1,149 @@
 import argparse
+import os
 import sys
 import json
-from .engine import GuardrailsEngine, StrictPolicy
+from .engine import GuardrailsEngine, StrictPolicy, RelaxedPolicy, Policy
 from .ml import OnnxJailbreakClassifier
+from .models import GuardrailAction
+
+def _load_policy(name_or_path: str) -> Policy:
+    if name_or_path == "strict":
+        return StrictPolicy()
+    if name_or_path == "relaxed":
+        return RelaxedPolicy()
+    return Policy.from_file(name_or_path)
+
+def calibrate_main(argv):
+    from .calibration import calibrate, load_labeled_csv, score_texts, write_policy
+
+    parser = argparse.ArgumentParser(
+        prog="safellmkit calibrate",
+        description="Tune classifier BLOCK/SANITIZE cutoffs on a labeled CSV"
+    )
+    parser.add_argument("csv", type=str, help="CSV with a text column and a 0/1 label column")
+    parser.add_argument("--onnx", type=str, required=True, help="Path to ONNX model")
+    parser.add_argument("--out", type=str, required=True, help="Where to write the calibrated policy JSON")
+    parser.add_argument("--base-policy", type=str, default="strict", help="strict, relaxed or a policy JSON path")
+    parser.add_argument("--block-fpr", type=float, default=0.01, help="Target false-positive rate for BLOCK")
+    parser.add_argument("--sanitize-fpr", type=float, default=0.05, help="Target false-positive rate for SANITIZE")
+    parser.add_argument("--text-column", type=str, default=None)
+    parser.add_argument("--label-column", type=str, default=None)
+    parser.add_argument("--cache-dir", type=str, default=".safellmkit-cache", help="Score cache directory ('' disables)")
+    parser.add_argument("--report", type=str, default=None, help="Write the full PR/ROC report JSON here")
+
+    args = parser.parse_args(argv)
+
+    texts, labels = load_labeled_csv(args.csv, args.text_column, args.label_column)
+    classifier = OnnxJailbreakClassifier(args.onnx)
+    probabilities = score_texts(classifier, texts, cache_dir=args.cache_dir or None)
+    report = calibrate(probabilities, labels, block_fpr=args.block_fpr, sanitize_fpr=args.sanitize_fpr)
+
+    write_policy(_load_policy(args.base_policy).config, report["ml_thresholds"], args.out)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    summary = {k: v for k, v in report.items() if k != "curve"}
+    print(json.dumps(summary, indent=2))
+
+def lexicon_main(argv):
+    from .lexicon import Lexicon
+
+    parser = argparse.ArgumentParser(
+        prog="safellmkit lexicon",
+        description="Compile a term list (txt/tsv/csv) into a memory-mappable lexicon"
+    )
+    parser.add_argument("terms", type=str, help="Term list: term[<TAB>severity[<TAB>category]] per line")
+    parser.add_argument("out", type=str, help="Output lexicon file (e.g. terms.slka)")
+    parser.add_argument("--severity", type=int, default=5, help="Severity for terms without one")
+    parser.add_argument("--category", type=str, default="CONTENT_SAFETY", help="Category for terms without one")
+
+    args = parser.parse_args(argv)
+    lexicon = Lexicon.from_file(args.terms, severity=args.severity, category=args.category)
+    lexicon.save(args.out)
+    print(json.dumps({"terms": len(lexicon), "max_words": lexicon.max_words, "categories": lexicon.categories}))
+
+def attacks_main(argv):
+    from .minhash import KnownAttackIndex
+
+    parser = argparse.ArgumentParser(
+        prog="safellmkit attacks",
+        description="Build a near-duplicate index from a corpus of known attack prompts"
+    )
+    parser.add_argument("corpus", type=str, nargs="+", help="CSV files (prompt/text column) or .txt files, one prompt per line")
+    parser.add_argument("--out", type=str, required=True, help="Output index file (e.g. attacks.slka)")
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--bands", type=int, default=32)
+
+    args = parser.parse_args(argv)
+    texts = []
+    for path in args.corpus:
+        texts.extend(_read_prompts(path))
+    texts = list(dict.fromkeys(t for t in texts if t.strip()))
+    index = KnownAttackIndex.build(texts, num_perm=args.num_perm, bands=args.bands)
+    index.save(args.out)
+    print(json.dumps({"prompts": len(index), "num_perm": index.num_perm, "bands": index.bands}))
+
+def file_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="safellmkit file",
+        description="Validate a large UTF-8 file in bounded memory"
+    )
+    parser.add_argument("path", type=str, help="File to validate")
+    parser.add_argument("--out", type=str, default=None, help="Write the sanitized document here")
+    parser.add_argument("--policy", type=str, default="strict", help="strict, relaxed or a policy JSON path")
+    parser.add_argument("--chunk-size", type=int, default=1 << 20, help="Window size in bytes")
+
+    args = parser.parse_args(argv)
+    engine = GuardrailsEngine(_load_policy(args.policy))
+    if args.out:
+        with open(args.out, "wb") as out:
+            result = engine.validate_file(args.path, out=out, chunk_size=args.chunk_size)
+        if result.action == GuardrailAction.BLOCK:
+            # Partial output of a blocked document must not be used
+            os.remove(args.out)
+    else:
+        result = engine.validate_file(args.path, chunk_size=args.chunk_size)
+    print(result.model_dump_json(indent=2))
+
+def _read_prompts(path: str):
+    import csv
+    from .calibration import TEXT_COLUMNS
+
+    if not path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f]
+    csv.field_size_limit(1 << 24)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        column = next((c for c in TEXT_COLUMNS if c in (reader.fieldnames or [])), None)
+        if column is None:
+            raise ValueError(f"No prompt/text column in {path}: {reader.fieldnames}")
+        return [row[column] or "" for row in reader]
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "calibrate":
+        return calibrate_main(argv[1:])
+    if argv and argv[0] == "lexicon":
+        return lexicon_main(argv[1:])
+    if argv and argv[0] == "attacks":
+        return attacks_main(argv[1:])
+    if argv and argv[0] == "file":
+        return file_main(argv[1:])
 
-def main():
     parser = argparse.ArgumentParser(description="SafeLLMKit CLI")
     parser.add_argument("prompt", type=str, help="Input prompt to validate")
     parser.add_argument("--onnx", type=str, help="Path to ONNX model", default=None)
+    parser.add_argument("--policy", type=str, help="strict, relaxed or a policy JSON path", default="strict")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     classifier = None
     if args.onnx:
         classifier = OnnxJailbreakClassifier(args.onnx)
         
-    engine = GuardrailsEngine(StrictPolicy(), classifier)
+    engine = GuardrailsEngine(_load_policy(args.policy), classifier)
     result = engine.validate_input(args.prompt)
     
     # Print JSON output
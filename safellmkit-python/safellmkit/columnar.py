@@ -0,0 +1,399 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from .models import GuardrailAction
+from .text import TextView
+
+# Action codes used by columnar results; ordered so that max() picks the strictest action
+ACTIONS = (GuardrailAction.ALLOW, GuardrailAction.SANITIZE, GuardrailAction.BLOCK)
+ACTION_CODES = {action.value: code for code, action in enumerate(ACTIONS)}
+
+ML_RULE_NAME = "OnnxJailbreakClassifier"
+ML_CATEGORY = "ML_CLASSIFIER"
+
+
+class FindingsTable:
+    """
+    Exploded findings: one entry per finding, stored as parallel arrays.
+    `row` indexes into the validated column; `rule_id` indexes into `rule_names`.
+    """
+
+    def __init__(
+        self,
+        row: np.ndarray,
+        rule_id: np.ndarray,
+        severity: np.ndarray,
+        message: np.ndarray,
+        start: np.ndarray,
+        end: np.ndarray,
+        rule_names: List[str],
+        categories: List[str]
+    ):
+        self.row = row
+        self.rule_id = rule_id
+        self.severity = severity
+        self.message = message
+        self.start = start
+        self.end = end
+        self.rule_names = rule_names
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.row)
+
+    @property
+    def rule(self) -> np.ndarray:
+        return np.asarray(self.rule_names, dtype=object)[self.rule_id]
+
+    @property
+    def category(self) -> np.ndarray:
+        return np.asarray(self.categories, dtype=object)[self.rule_id]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "row": self.row,
+            "rule": self.rule,
+            "category": self.category,
+            "severity": self.severity,
+            "message": self.message,
+            "start": self.start,
+            "end": self.end,
+        }
+
+    def to_pandas(self):
+        if pd is None:
+            raise ImportError("pandas is required for FindingsTable.to_pandas()")
+        return pd.DataFrame({
+            "row": self.row,
+            "rule": pd.Categorical.from_codes(self.rule_id, self.rule_names),
+            "category": pd.Categorical(self.category),
+            "severity": self.severity,
+            "message": self.message,
+            "start": self.start,
+            "end": self.end,
+        })
+
+    def to_arrow(self):
+        if pa is None:
+            raise ImportError("pyarrow is required for FindingsTable.to_arrow()")
+        return pa.table({
+            "row": self.row,
+            "rule": pa.DictionaryArray.from_arrays(self.rule_id, self.rule_names),
+            "category": pa.array(self.category, type=pa.string()).dictionary_encode(),
+            "severity": self.severity,
+            "message": pa.array(self.message, type=pa.string()),
+            "start": self.start,
+            "end": self.end,
+        })
+
+
+class ColumnarResult:
+    """
+    Column-oriented counterpart of GuardrailResult for a whole column of texts.
+    `action_codes` index into ACTIONS; null input rows are reported as ALLOW.
+    """
+
+    def __init__(
+        self,
+        action_codes: np.ndarray,
+        risk_scores: np.ndarray,
+        findings: FindingsTable,
+        safe_text: Optional[np.ndarray] = None
+    ):
+        self.action_codes = action_codes
+        self.risk_scores = risk_scores
+        self.findings = findings
+        self.safe_text = safe_text
+
+    def __len__(self) -> int:
+        return len(self.action_codes)
+
+    @property
+    def actions(self) -> np.ndarray:
+        return np.asarray([a.value for a in ACTIONS], dtype=object)[self.action_codes]
+
+    def to_pandas(self, index=None):
+        if pd is None:
+            raise ImportError("pandas is required for ColumnarResult.to_pandas()")
+        columns = {
+            "action": pd.Categorical.from_codes(self.action_codes, [a.value for a in ACTIONS]),
+            "risk_score": self.risk_scores,
+        }
+        if self.safe_text is not None:
+            columns["safe_text"] = self.safe_text
+        return pd.DataFrame(columns, index=index)
+
+    def to_arrow(self):
+        if pa is None:
+            raise ImportError("pyarrow is required for ColumnarResult.to_arrow()")
+        columns = {
+            "action": pa.DictionaryArray.from_arrays(self.action_codes, [a.value for a in ACTIONS]),
+            "risk_score": self.risk_scores,
+        }
+        if self.safe_text is not None:
+            columns["safe_text"] = pa.array(self.safe_text, type=pa.string())
+        return pa.table(columns)
+
+
+def _is_null(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return value != value
+    return pd is not None and pd.api.types.is_scalar(value) and bool(pd.isna(value))
+
+
+def to_text_list(values) -> List[Optional[str]]:
+    """Converts a pandas Series, Arrow array, numpy array or sequence into str/None items."""
+    if hasattr(values, "to_pylist"):
+        items = values.to_pylist()
+    elif hasattr(values, "tolist"):
+        items = values.tolist()
+    else:
+        items = list(values)
+    return [v if isinstance(v, str) else (None if _is_null(v) else str(v)) for v in items]
+
+
+class Detection:
+    """
+    Raw detector output for distinct texts: per-rule max severity (-1 = no hit),
+    classifier probabilities and one entry per hit in parallel lists.
+    `hit_rule` indexes into `rule_types`.
+    """
+
+    def __init__(self, rule_types: List[str], size: int):
+        self.rule_types = rule_types
+        self.severities = np.full((size, len(rule_types)), -1, dtype=np.int16)
+        self.probabilities: Optional[np.ndarray] = None
+        self.hit_row: List[int] = []
+        self.hit_rule: List[int] = []
+        self.hit_severity: List[int] = []
+        self.hit_message: List[str] = []
+        self.hit_start: List[int] = []
+        self.hit_end: List[int] = []
+
+
+def policy_rule_types(engine) -> List[str]:
+    """Distinct rule types the engine runs, in policy order."""
+    rule_types: List[str] = []
+    for entry in engine.policy.input_rules:
+        r_type = entry["rule_type"]
+        if r_type in engine.rules_instances and r_type not in rule_types:
+            rule_types.append(r_type)
+    return rule_types
+
+
+def detect(engine, views: List[TextView], candidates=None) -> Detection:
+    detection = Detection(policy_rule_types(engine), len(views))
+    for col, r_type in enumerate(detection.rule_types):
+        rule = engine.rules_instances[r_type]
+        for j, view in enumerate(views):
+            if candidates is not None and r_type not in candidates[j]:
+                continue
+            hits = rule.scan(view)
+            if not hits:
+                continue
+            detection.severities[j, col] = max(h.severity for h in hits)
+            for h in hits:
+                detection.hit_row.append(j)
+                detection.hit_rule.append(col)
+                detection.hit_severity.append(h.severity)
+                detection.hit_message.append(h.message)
+                detection.hit_start.append(h.start)
+                detection.hit_end.append(h.end)
+
+    if engine.classifier and views:
+        detection.probabilities = engine.classifier.predict_batch(views)
+    return detection
+
+
+def decide(
+    input_rules: List[dict],
+    rule_types: List[str],
+    severities: np.ndarray,
+    probabilities: Optional[np.ndarray],
+    ml_thresholds: Dict[str, float],
+    classifier_threshold: float = 0.5
+):
+    """
+    Vectorized version of the decision logic in GuardrailsEngine.validate_input:
+    turns per-rule severities and ML probabilities into (action_codes, risk_scores).
+    Entries whose rule type has no severity column are skipped; `ml_thresholds`
+    is the policy's {"block", "sanitize"} cutoffs and `classifier_threshold` the
+    classifier's own is_jailbreak cut.
+    """
+    m = len(severities)
+    columns = {r_type: col for col, r_type in enumerate(rule_types)}
+    action_codes = np.zeros(m, dtype=np.int8)
+    max_sev = np.zeros(m, dtype=np.int64)
+    for entry in input_rules:
+        col = columns.get(entry["rule_type"])
+        if col is None:
+            continue
+        sev = severities[:, col]
+        max_sev = np.maximum(max_sev, sev)
+        code = ACTION_CODES.get(entry["action_mode"], 0)
+        if code == 0:
+            continue
+        triggered = (sev >= 0) & (sev >= entry.get("min_severity", 0))
+        action_codes[triggered] = np.maximum(action_codes[triggered], code)
+
+    if probabilities is not None:
+        scored = ~np.isnan(probabilities)
+        prob = np.where(scored, probabilities, 0).astype(np.float64)
+        max_sev = np.maximum(max_sev, (prob * 10).astype(np.int64))
+        # Same nesting as apply_policy: cutoffs only act on flagged probabilities
+        flagged = scored & ((prob >= classifier_threshold) | (prob >= ml_thresholds["sanitize"]))
+        sanitize = flagged & (prob >= ml_thresholds["sanitize"])
+        action_codes[sanitize] = np.maximum(action_codes[sanitize], 1)
+        action_codes[flagged & (prob >= ml_thresholds["block"])] = 2
+    risk = np.minimum(max_sev * 10, 100).astype(np.uint8)
+    return action_codes, risk
+
+
+def dedupe_texts(texts: List[Optional[str]]):
+    """Returns (distinct texts, inverse index with -1 for null rows)."""
+    index: Dict[str, int] = {}
+    unique: List[str] = []
+    inverse = np.full(len(texts), -1, dtype=np.int64)
+    for i, text in enumerate(texts):
+        if text is None:
+            continue
+        j = index.get(text)
+        if j is None:
+            j = index[text] = len(unique)
+            unique.append(text)
+        inverse[i] = j
+    return unique, inverse
+
+
+def validate_column(engine, values, with_safe_text: bool = True) -> ColumnarResult:
+    texts = to_text_list(values)
+    n = len(texts)
+
+    # Evaluate each distinct text once; prompt logs are heavily duplicated
+    unique, inverse = dedupe_texts(texts)
+    m = len(unique)
+
+    views = [TextView(t) for t in unique]
+    candidates = [engine.prefilter.candidates(v) for v in views] if engine.prefilter else None
+
+    # 1. Detection
+    detection = detect(engine, views, candidates)
+    probabilities = detection.probabilities
+
+    # 2. Decision, vectorized over distinct texts
+    thresholds = engine.policy.ml_thresholds
+    classifier_threshold = getattr(engine.classifier, "threshold", 0.5)
+    action_codes, risk = decide(
+        engine.policy.input_rules, detection.rule_types, detection.severities, probabilities, thresholds,
+        classifier_threshold
+    )
+
+    rule_names: List[str] = []
+    categories: List[str] = []
+    type_rule_ids: List[int] = []
+    for r_type in detection.rule_types:
+        rule = engine.rules_instances[r_type]
+        if rule.name not in rule_names:
+            rule_names.append(rule.name)
+            categories.append(rule.category)
+        type_rule_ids.append(rule_names.index(rule.name))
+
+    f_row = detection.hit_row
+    f_rule = [type_rule_ids[col] for col in detection.hit_rule]
+    f_sev = detection.hit_severity
+    f_msg = detection.hit_message
+    f_start = detection.hit_start
+    f_end = detection.hit_end
+    if probabilities is not None:
+        if ML_RULE_NAME not in rule_names:
+            rule_names.append(ML_RULE_NAME)
+            categories.append(ML_CATEGORY)
+        ml_rule_id = rule_names.index(ML_RULE_NAME)
+        # Same rule as validate_input: classifier's own cut or the sanitize cutoff
+        flag = min(classifier_threshold, thresholds["sanitize"])
+        for j in np.flatnonzero(probabilities >= flag).tolist():
+            f_row.append(j)
+            f_rule.append(ml_rule_id)
+            f_sev.append(int(float(probabilities[j]) * 10))
+            f_msg.append(f"ML Model detected jailbreak probability {probabilities[j]:.2f}")
+            f_start.append(-1)
+            f_end.append(-1)
+
+    unique_safe = None
+    if with_safe_text:
+        sanitizers = [
+            e["rule_type"] for e in engine.policy.input_rules
+            if e["action_mode"] == "SANITIZE" and e["rule_type"] in engine.rules_instances
+        ]
+        unique_safe = np.empty(m, dtype=object)
+        for j, text in enumerate(unique):
+            if action_codes[j] == ACTION_CODES["BLOCK"]:
+                continue
+            for r_type in sanitizers:
+                if candidates is None or r_type in candidates[j]:
+                    text = engine.rules_instances[r_type].sanitize(text)
+            unique_safe[j] = text
+
+    # 3. Expand distinct-text results back onto the input rows
+    valid = inverse >= 0
+    gather = np.where(valid, inverse, 0)
+    out_actions = np.where(valid, action_codes[gather] if m else 0, 0).astype(np.int8)
+    out_risk = np.where(valid, risk[gather] if m else 0, 0).astype(np.uint8)
+    out_safe = None
+    if unique_safe is not None:
+        out_safe = np.empty(n, dtype=object)
+        if m:
+            out_safe[valid] = unique_safe[inverse[valid]]
+
+    findings = _explode_findings(
+        inverse, m,
+        np.asarray(f_row, dtype=np.int64),
+        np.asarray(f_rule, dtype=np.int16),
+        np.asarray(f_sev, dtype=np.int8),
+        np.asarray(f_msg, dtype=object),
+        np.asarray(f_start, dtype=np.int64),
+        np.asarray(f_end, dtype=np.int64),
+        rule_names,
+        categories
+    )
+    return ColumnarResult(out_actions, out_risk, findings, out_safe)
+
+
+def _explode_findings(inverse, m, f_row, f_rule, f_sev, f_msg, f_start, f_end, rule_names, categories):
+    # Group distinct-text findings by text (stable keeps policy order within a row)
+    order = np.argsort(f_row, kind="stable")
+    counts = np.bincount(f_row, minlength=m)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    rows = np.flatnonzero(inverse >= 0)
+    sources = inverse[rows]
+    lengths = counts[sources] if m else np.zeros(0, dtype=np.int64)
+    total = int(lengths.sum())
+    out_row = np.repeat(rows, lengths)
+    within = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    src = order[np.repeat(offsets[sources], lengths) + within] if total else np.zeros(0, dtype=np.int64)
+
+    return FindingsTable(
+        row=out_row,
+        rule_id=f_rule[src],
+        severity=f_sev[src],
+        message=f_msg[src],
+        start=f_start[src],
+        end=f_end[src],
+        rule_names=rule_names,
+        categories=categories
+    )
+
@@ -0,0 +1,196 @@
+import io
+import logging
+import mmap
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .engine import apply_policy
+from .models import GuardrailResult
+from .rules import Rule, RuleHit
+from .text import TextView, normalize
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def window_overlap(rules: Iterable[Rule]) -> int:
+    """Non-whitespace characters consecutive windows share so no bounded match is cut."""
+    return max([length for length in (rule.max_match_length() for rule in rules) if length] + [1])
+
+
+def _cut(block: bytes, final: bool) -> int:
+    """How much of `block` to scan: through its last whitespace byte in the second half."""
+    if final:
+        return len(block)
+    half = len(block) // 2
+    cut = max(block.rfind(ws, half) for ws in (b" ", b"\n", b"\t", b"\r"))
+    if cut >= 0:
+        return cut + 1
+    # One huge token: fall back to a UTF-8 character boundary
+    cut = len(block) - 1
+    while cut > 0 and block[cut] & 0xC0 == 0x80:
+        cut -= 1
+    return cut
+
+
+def _visible(text: str) -> int:
+    return sum(1 for c in text if not c.isspace())
+
+
+def _overlap_start(text: str, overlap: int) -> int:
+    """
+    Start (just after a whitespace character) of the shortest suffix of `text`
+    holding `overlap` non-whitespace characters, both as written and normalized;
+    0 if the window is too short.
+    """
+    raw = normalized = 0
+    i = len(text)
+    while i > 0:
+        i -= 1
+        ch = text[i]
+        if ch.isspace():
+            # The per-character count overestimates composed sequences; confirm on the suffix
+            if raw >= overlap and normalized >= overlap and _visible(normalize(text[i + 1:])) >= overlap:
+                return i + 1
+            continue
+        raw += 1
+        normalized += _visible(normalize(ch))
+    return 0
+
+
+def _write(out, text: str) -> None:
+    if isinstance(out, io.TextIOBase):
+        out.write(text)
+    else:
+        out.write(text.encode("utf-8", "surrogateescape"))
+
+
+def validate_buffer(engine, buffer, out=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> GuardrailResult:
+    """
+    Validates a UTF-8 document held in any buffer (bytes, memoryview, mmap) in
+    whitespace-aligned windows of about `chunk_size` bytes, so peak memory does not
+    grow with the document. Consecutive windows overlap by the longest
+    max_match_length() of the policy's rules, so bounded matches are never lost at
+    a boundary; hits from all windows are merged by each rule's merge_window_hits()
+    (SignalJailbreakRule re-scores the union of its signals). Rules without a bound
+    (KnownAttackRule) score each window on its own, and the classifier reads the
+    first window (its tokenizer only sees the leading tokens anyway).
+
+    With `out` (a binary or text writer), the policy's SANITIZE-mode rules are
+    applied segment by segment and the sanitized document is streamed to it; segment
+    cuts never fall inside a span reported by sanitize_spans(). Output is written
+    before the verdict is known: discard it if the result is BLOCK. The returned
+    result never carries `safe_text`.
+    """
+    policy = engine.policy
+    rules: List[Tuple[str, Rule]] = []
+    for entry in policy.input_rules:
+        r_type = entry["rule_type"]
+        if r_type in engine.rules_instances and all(r_type != t for t, _ in rules):
+            rules.append((r_type, engine.rules_instances[r_type]))
+    sanitizers: List[Rule] = []
+    if out is not None:
+        sanitizers = [
+            engine.rules_instances[e["rule_type"]] for e in policy.input_rules
+            if e["action_mode"] == "SANITIZE" and e["rule_type"] in engine.rules_instances
+        ]
+    overlap = window_overlap(rule for _, rule in rules)
+    # Windows must comfortably exceed the overlap to make progress
+    if chunk_size < 16 * overlap:
+        raise ValueError(f"chunk_size must be at least {16 * overlap} bytes for this policy")
+
+    hits: Dict[str, List[RuleHit]] = {}
+    ml = None
+    with memoryview(buffer) as data:
+        data = data.cast("B") if data.format != "B" or data.ndim != 1 else data
+        size = len(data)
+        pos = 0
+        written = 0  # output is complete up to this byte
+        previous: Optional[Tuple[int, List[Tuple[int, int]]]] = None  # (end, sanitize spans)
+        while True:
+            final = pos + chunk_size >= size
+            block = bytes(data[pos:min(pos + chunk_size, size)])
+            block = block[:_cut(block, final)]
+            end = pos + len(block)
+            # surrogateescape keeps invalid bytes one-to-one, so offsets and output round-trip
+            text = block.decode("utf-8", "surrogateescape")
+            single_byte = len(text) == len(block)
+
+            def to_document(index: int, pos=pos, text=text, single_byte=single_byte) -> int:
+                if index < 0 or single_byte:
+                    return index if index < 0 else pos + index
+                return pos + len(text[:index].encode("utf-8", "surrogateescape"))
+
+            view = TextView(text)
+            candidates = engine.prefilter.candidates(view) if engine.prefilter else None
+            for r_type, rule in rules:
+                if candidates is not None and r_type not in candidates:
+                    continue
+                found = hits.setdefault(r_type, [])
+                for hit in rule.scan(view):
+                    found.append(hit._replace(start=to_document(hit.start), end=to_document(hit.end)))
+            if ml is None and engine.classifier is not None:
+                ml = engine.classifier.predict(view)
+
+            if sanitizers:
+                spans = [
+                    (to_document(a), to_document(b))
+                    for rule in dict.fromkeys(sanitizers) for a, b in rule.sanitize_spans(text)
+                ]
+                if previous is not None:
+                    shared = len(bytes(data[pos:previous[0]]).decode("utf-8", "surrogateescape"))
+                    cut = _output_cut(text, shared, previous[0], previous[1] + spans, to_document)
+                    _write_segment(out, data, written, cut, sanitizers)
+                    written = max(written, cut)
+                previous = (end, spans)
+
+            if final:
+                break
+            start = _overlap_start(text, overlap)
+            if start == 0:
+                logging.warning("Document window too small for the rule overlap; windows will not overlap")
+            pos = to_document(start) if start else end
+
+        if sanitizers:
+            _write_segment(out, data, written, size, sanitizers)
+
+    merged = {r_type: engine.rules_instances[r_type].merge_window_hits(found) for r_type, found in hits.items()}
+    result = apply_policy(policy, engine.rules_instances, "", merged, ml)
+    return result.model_copy(update={"safe_text": None})
+
+
+def _output_cut(text: str, shared: int, previous_end: int, spans, to_document) -> int:
+    """
+    Latest position in the overlap (the first `shared` characters of `text`) that
+    follows whitespace, or starts the window, and lies inside no sanitize span.
+    """
+    start = to_document(0)
+    spans = [(a, b) for a, b in spans if b > start and a < previous_end]
+    index = shared
+    while index >= 0:
+        if index == 0 or text[index - 1].isspace():
+            cut = to_document(index)
+            if not any(a < cut < b for a, b in spans):
+                return cut
+        index -= 1
+    logging.warning("No sanitize-safe cut in document window overlap; a redaction may be split")
+    return previous_end
+
+
+def _write_segment(out, data, start: int, end: int, sanitizers: List[Rule]) -> None:
+    if end <= start:
+        return
+    segment = bytes(data[start:end]).decode("utf-8", "surrogateescape")
+    for rule in sanitizers:
+        segment = rule.sanitize(segment)
+    _write(out, segment)
+
+
+def validate_file(engine, path: str, out=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> GuardrailResult:
+    """validate_buffer() over a memory-mapped file; pages are read as windows advance."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return validate_buffer(engine, b"", out=out, chunk_size=chunk_size)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            return validate_buffer(engine, mapped, out=out, chunk_size=chunk_size)
@@ -1,30 +1,53 @@
+import hashlib
 import json
 import os
 import logging
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict, Tuple, Union
 from pathlib import Path
+from importlib import metadata
 import pkg_resources
 
 from .models import GuardrailResult, GuardrailAction, GuardrailFinding
-from .rules import Rule, PromptInjectionRule, SignalJailbreakRule, PiiRule, ToxicityRule
-from .ml import OnnxJailbreakClassifier
+from .rules import Rule, RuleHit, PromptInjectionRule, SignalJailbreakRule, PiiRule, ToxicityRule, KnownAttackRule
+from .ml import OnnxJailbreakClassifier, CascadeClassifier
+from .columnar import ColumnarResult, policy_rule_types, validate_column
+from .prefilter import Prefilter
+from .store import CorpusScan, VerdictStore
+from .replay import SignalBatch, SignalRecorder, collect_signals
+from .shadow import ShadowEvaluator
+from .aggregate import RiskAggregator
+from .vault import PseudonymVault
+from .text import TextView, fingerprint as text_fingerprint
 
 # Rule registry
 RULE_MAP = {
     "PromptInjectionRule": PromptInjectionRule,
     "SignalJailbreakRule": SignalJailbreakRule,
     "PiiRule": PiiRule,
-    "ToxicityRule": ToxicityRule
+    "ToxicityRule": ToxicityRule,
+    "KnownAttackRule": KnownAttackRule
 }
 
+# Classifier probability cutoffs used when a policy does not set "ml_thresholds"
+DEFAULT_ML_THRESHOLDS = {"block": 0.85, "sanitize": 0.55}
+
 class Policy:
     def __init__(self, config: dict):
         self.config = config
 
+    @classmethod
+    def from_file(cls, path: str) -> "Policy":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
     @property
     def input_rules(self) -> List[dict]:
         return self.config.get("input_rules", [])
 
+    @property
+    def ml_thresholds(self) -> Dict[str, float]:
+        return {**DEFAULT_ML_THRESHOLDS, **self.config.get("ml_thresholds", {})}
+
 class StrictPolicy(Policy):
     def __init__(self):
         content = pkg_resources.resource_string(__name__, "policies/strict.json")
@@ -35,8 +58,119 @@ class RelaxedPolicy(Policy):
         content = pkg_resources.resource_string(__name__, "policies/relaxed.json")
         super().__init__(json.loads(content))
 
+def apply_policy(
+    policy: Policy,
+    rules: Dict[str, Rule],
+    text: str,
+    hits: Dict[str, List[RuleHit]],
+    ml: Optional[Tuple[bool, float]] = None,
+    sanitize_cache: Optional[Dict] = None,
+    vault: Optional[PseudonymVault] = None
+) -> GuardrailResult:
+    """
+    Policy decision over already-computed detector output. `hits` holds the scan
+    result per rule type (absent = skipped by the prefilter), `ml` the classifier's
+    (is_jailbreak, probability). `sanitize_cache` lets callers deciding several
+    policies for one text share sanitize() calls. With a `vault`, sanitize-mode
+    rules pseudonymize instead (see PseudonymVault).
+    """
+    findings: List[GuardrailFinding] = []
+    action = GuardrailAction.ALLOW
+    max_severity = 0
+    safe_text = text
+
+    for entry in policy.input_rules:
+        r_type = entry["rule_type"]
+        rule_action = entry["action_mode"] # BLOCK, SANITIZE, ALLOW
+        min_severity = entry.get("min_severity", 0)
+
+        rule = rules.get(r_type)
+        if not rule or r_type not in hits:
+            continue
+
+        rule_findings = [
+            GuardrailFinding(category=rule.category, rule=rule.name, severity=h.severity, message=h.message)
+            for h in hits[r_type]
+        ]
+        findings.extend(rule_findings)
+
+        # Action determination
+        for f in rule_findings:
+            if f.severity > max_severity:
+                max_severity = f.severity
+
+            if f.severity >= min_severity:
+                if rule_action == "BLOCK":
+                    action = GuardrailAction.BLOCK
+                elif rule_action == "SANITIZE" and action != GuardrailAction.BLOCK:
+                    action = GuardrailAction.SANITIZE
+
+        # Sanitize-mode rules always rewrite safe_text, with or without findings
+        if rule_action == "SANITIZE":
+            if vault is not None:
+                safe_text = rule.pseudonymize(safe_text, vault)
+            elif sanitize_cache is None:
+                safe_text = rule.sanitize(safe_text)
+            else:
+                cache_key = (id(rule), safe_text)
+                if cache_key not in sanitize_cache:
+                    sanitize_cache[cache_key] = rule.sanitize(safe_text)
+                safe_text = sanitize_cache[cache_key]
+
+    # Merge ML
+    if ml is not None:
+        is_jailbreak, prob = ml
+        # Policy cutoffs (defaults: >= 0.85 BLOCK, >= 0.55 SANITIZE)
+        thresholds = policy.ml_thresholds
+        ml_sev = int(prob * 10)
+        if ml_sev > max_severity:
+            max_severity = ml_sev
+
+        if is_jailbreak or prob >= thresholds["sanitize"]:
+            findings.append(GuardrailFinding(
+                category="ML_CLASSIFIER",
+                rule="OnnxJailbreakClassifier",
+                severity=ml_sev,
+                message=f"ML Model detected jailbreak probability {prob:.2f}"
+            ))
+            if prob >= thresholds["block"]:
+                action = GuardrailAction.BLOCK
+            elif prob >= thresholds["sanitize"] and action != GuardrailAction.BLOCK:
+                action = GuardrailAction.SANITIZE
+
+    # Calculate risk score (0..100)
+    risk_score = min(max_severity * 10, 100)
+
+    msg = None
+    if action == GuardrailAction.BLOCK:
+        msg = "Input blocked by security policy."
+        safe_text = None
+
+    return GuardrailResult(
+        action=action,
+        risk_score=risk_score,
+        findings=findings,
+        safe_text=safe_text,
+        message_to_user=msg
+    )
+
 class GuardrailsEngine:
-    def __init__(self, policy: Policy, classifier: Optional[OnnxJailbreakClassifier] = None):
+    def __init__(
+        self,
+        policy: Policy,
+        classifier: Optional[Union[OnnxJailbreakClassifier, CascadeClassifier]] = None,
+        prefilter: Union[bool, Prefilter] = False,
+        record_signals: bool = False,
+        shadow: Optional[ShadowEvaluator] = None,
+        aggregator: Optional[RiskAggregator] = None,
+        rule_factory: Optional[Callable[[dict], Rule]] = None
+    ):
+        """
+        prefilter: True builds a Prefilter for this policy's rules; a Prefilter
+        instance (built over the same rules) is used as-is.
+        rule_factory: builds the rule for a policy entry instead of constructing it
+        here, e.g. to share detector instances (see EnginePool).
+        """
         self.policy = policy
         self.classifier = classifier
         self.rules_instances: Dict[str, Rule] = {}
@@ -45,79 +179,131 @@ class GuardrailsEngine:
         for entry in policy.input_rules:
             r_type = entry["rule_type"]
             if r_type in RULE_MAP and r_type not in self.rules_instances:
-                self.rules_instances[r_type] = RULE_MAP[r_type]()
+                if rule_factory is not None:
+                    self.rules_instances[r_type] = rule_factory(entry)
+                else:
+                    # Optional constructor arguments, e.g. {"params": {"lexicon": "terms.slka"}}
+                    self.rules_instances[r_type] = RULE_MAP[r_type](**entry.get("params", {}))
 
-    def validate_input(self, text: str) -> GuardrailResult:
-        findings: List[GuardrailFinding] = []
-        action = GuardrailAction.ALLOW
-        max_severity = 0
-        safe_text = text
+        # Optional benign-text fast path; see Prefilter for the no-false-negative contract
+        if isinstance(prefilter, Prefilter):
+            self.prefilter: Optional[Prefilter] = prefilter
+        else:
+            self.prefilter = Prefilter(self.rules_instances) if prefilter else None
 
-        # 1. Run Rules
+        # Optional raw-signal log for offline policy replay (see replay.replay)
+        self.signals: Optional[SignalRecorder] = (
+            SignalRecorder(policy_rule_types(self), getattr(self.classifier, "threshold", 0.5))
+            if record_signals else None
+        )
+
+        # Optional candidate stages evaluated off the request path; never affect verdicts
+        self.shadow = shadow
+
+        # Optional per-key windowed risk; applied when validate_input gets a `key`
+        self.aggregator = aggregator
+
+    def fingerprint(self) -> str:
+        """
+        Identifies everything that can change a verdict: package version, policy
+        config, rule tables and classifier model. Used to key cached verdicts.
+        """
+        try:
+            version = metadata.version("safellmkit")
+        except metadata.PackageNotFoundError:
+            version = "unknown"
+        parts = [version, text_fingerprint(), json.dumps(self.policy.config, sort_keys=True)]
+        for r_type in sorted(self.rules_instances):
+            parts.append(f"{r_type}:{self.rules_instances[r_type].fingerprint()}")
+        if self.classifier is not None:
+            classifier_fp = getattr(self.classifier, "fingerprint", None)
+            parts.append(classifier_fp() if classifier_fp else type(self.classifier).__qualname__)
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def validate_input(
+        self,
+        text: str,
+        key: Optional[str] = None,
+        vault: Optional[PseudonymVault] = None
+    ) -> GuardrailResult:
+        """
+        key: caller identity (user, tenant, IP) for the optional RiskAggregator; an
+        escalated key gets a stricter verdict.
+        vault: pseudonymize PII into reversible placeholders ([EMAIL_1], ...) instead
+        of redacting it; restore the model's output with vault.restore() or
+        vault.restorer().
+        """
+        # Normalize once; every rule and the tokenizer read from this view
+        view = TextView(text)
+        candidates = self.prefilter.candidates(view) if self.prefilter else None
+
+        # 1. Run Rules (each distinct rule once, even if the policy lists it twice)
+        hits: Dict[str, List[RuleHit]] = {}
         for entry in self.policy.input_rules:
             r_type = entry["rule_type"]
-            rule_action = entry["action_mode"] # BLOCK, SANITIZE, ALLOW
-            min_severity = entry.get("min_severity", 0)
-            
             rule = self.rules_instances.get(r_type)
-            if not rule:
+            if not rule or r_type in hits:
+                continue
+            if candidates is not None and r_type not in candidates:
                 continue
+            hits[r_type] = rule.scan(view)
 
-            # Check
-            rule_findings = rule.check(text)
-            findings.extend(rule_findings)
-            
-            # Action determination
-            for f in rule_findings:
-                if f.severity > max_severity:
-                    max_severity = f.severity
-                
-                if f.severity >= min_severity:
-                    if rule_action == "BLOCK":
-                        action = GuardrailAction.BLOCK
-                    elif rule_action == "SANITIZE" and action != GuardrailAction.BLOCK:
-                        action = GuardrailAction.SANITIZE
-
-            # Sanitize if needed (and action is SANITIZE or ALLOW, but usually SANITIZE implies modify)
-            # If we block, we don't care about safe_text usually, but good to have
-            if rule_action == "SANITIZE":
-                # We sanitize REGARDLESS of findings? Or only if findings?
-                # Usually PiiRule.sanitize runs always on output_text.
-                # Logic: apply sanitize if configured to sanitize.
-                safe_text = rule.sanitize(safe_text)
+        # 2. Run ML (Optional)
+        ml = self.classifier.predict(view) if self.classifier else None
 
-        # 2. Run ML (Optional) -> merge
-        if self.classifier:
-             is_jailbreak, prob = self.classifier.predict(text)
-             # Thresholds from requirements: >= 0.85 BLOCK, >= 0.55 SANITIZE
-             ml_sev = int(prob * 10)
-             if ml_sev > max_severity:
-                 max_severity = ml_sev
-             
-             if is_jailbreak or prob >= 0.55:
-                 findings.append(GuardrailFinding(
-                     category="ML_CLASSIFIER",
-                     rule="OnnxJailbreakClassifier",
-                     severity=ml_sev,
-                     message=f"ML Model detected jailbreak probability {prob:.2f}"
-                 ))
-                 if prob >= 0.85:
-                     action = GuardrailAction.BLOCK
-                 elif prob >= 0.55 and action != GuardrailAction.BLOCK:
-                     action = GuardrailAction.SANITIZE
-
-        # Calculate risk score (0..100)
-        risk_score = min(max_severity * 10, 100)
-        
-        msg = None
-        if action == GuardrailAction.BLOCK:
-            msg = "Input blocked by security policy."
-            safe_text = None
-        
-        return GuardrailResult(
-            action=action,
-            risk_score=risk_score,
-            findings=findings,
-            safe_text=safe_text,
-            message_to_user=msg
-        )
+        if self.signals is not None:
+            self.signals.record(
+                {r_type: max(h.severity for h in rule_hits) for r_type, rule_hits in hits.items() if rule_hits},
+                ml[1] if ml else None,
+                [(r_type, h.start, h.end) for r_type, rule_hits in hits.items() for h in rule_hits if h.start >= 0]
+            )
+
+        result = apply_policy(self.policy, self.rules_instances, text, hits, ml, vault=vault)
+        if self.shadow is not None:
+            self.shadow.submit(text, result)
+        if self.aggregator is not None and key is not None:
+            result = self.aggregator.apply(key, result)
+        return result
+
+    def validate_file(self, path: str, out=None, chunk_size: int = 1 << 20) -> GuardrailResult:
+        """
+        Validates a large UTF-8 file through a memory map in overlapping windows,
+        with bounded memory; with `out`, the sanitized document is streamed to that
+        writer. See documents.validate_buffer for the exact semantics.
+        """
+        from .documents import validate_file
+        return validate_file(self, path, out=out, chunk_size=chunk_size)
+
+    def validate_buffer(self, buffer, out=None, chunk_size: int = 1 << 20) -> GuardrailResult:
+        """validate_file() over bytes, a memoryview or an mmap already in hand."""
+        from .documents import validate_buffer
+        return validate_buffer(self, buffer, out=out, chunk_size=chunk_size)
+
+    def validate_column(self, values, with_safe_text: bool = True) -> ColumnarResult:
+        """
+        Validates a whole column (pandas Series, Arrow array, numpy array or list of str)
+        and returns columnar results; findings are returned as a separate exploded table.
+        Decisions match validate_input row by row.
+        """
+        return validate_column(self, values, with_safe_text=with_safe_text)
+
+    def scan_corpus(
+        self,
+        texts,
+        store: VerdictStore,
+        scan_id: Optional[str] = None,
+        batch_size: int = 500
+    ) -> CorpusScan:
+        """
+        Bulk validation backed by a VerdictStore: yields (position, GuardrailResult),
+        skips records whose verdict is stored for this engine's fingerprint and,
+        with `scan_id`, resumes an interrupted scan from its last checkpoint.
+        """
+        return CorpusScan(self, texts, store, scan_id=scan_id, batch_size=batch_size)
+
+    def collect_signals(self, values) -> SignalBatch:
+        """
+        Runs detection only over a column of texts and returns raw signals that
+        replay() can turn into verdicts under any policy.
+        """
+        return collect_signals(self, values)
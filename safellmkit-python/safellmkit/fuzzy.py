@@ -0,0 +1,186 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+# Anything collapsing would change: a whitespace run or a non-space whitespace character
+_NEEDS_COLLAPSE = re.compile(r"\s{2,}|[^\S ]")
+_ASCII_NON_SPACE_WHITESPACE = "\t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+
+class FuzzyMatch(NamedTuple):
+    start: int
+    end: int
+    edits: int
+
+
+def allowed_edits(phrase: str, max_edits: int, min_length: int = 12, chars_per_edit: int = 6) -> int:
+    """
+    Edit budget for one phrase: phrases shorter than `min_length` stay exact, longer
+    ones get one edit per `chars_per_edit` characters, up to `max_edits` (0: always
+    `max_edits`).
+    """
+    if max_edits <= 0 or len(phrase) < min_length:
+        return 0
+    return min(max_edits, len(phrase) // chars_per_edit) if chars_per_edit > 0 else max_edits
+
+
+def collapse_whitespace(text: str) -> Tuple[str, Optional[List[int]]]:
+    """`text` with whitespace runs as single spaces, plus the original index of each character (None if unchanged)."""
+    # Substring checks are several times faster than the regex on the common ASCII text
+    if text.isascii():
+        if "  " not in text and not any(c in text for c in _ASCII_NON_SPACE_WHITESPACE):
+            return text, None
+    elif not _NEEDS_COLLAPSE.search(text):
+        return text, None
+    parts: List[str] = []
+    index: List[int] = []
+    pos = 0
+    for m in _WHITESPACE.finditer(text):
+        parts.append(text[pos:m.start()])
+        index.extend(range(pos, m.start()))
+        parts.append(" ")
+        index.append(m.start())
+        pos = m.end()
+    parts.append(text[pos:])
+    index.extend(range(pos, len(text)))
+    return "".join(parts), index
+
+
+def _pieces(phrase: str, edits: int) -> List[str]:
+    # Pigeonhole: a match with <= k edits contains one of k + 1 disjoint pieces exactly
+    size, extra = divmod(len(phrase), edits + 1)
+    pieces, start = [], 0
+    for i in range(edits + 1):
+        end = start + size + (1 if i < extra else 0)
+        pieces.append(phrase[start:end].strip())
+        start = end
+    return pieces
+
+
+def _match_start(text: str, end: int, phrase: str, limit: int) -> Tuple[int, int]:
+    """(start, edits) of the best alignment of `phrase` ending at `end`; per hit, so plain DP."""
+    window = text[max(0, end - len(phrase) - limit):end][::-1]
+    target = phrase[::-1]
+    # Rows: phrase characters; columns: text characters going backwards from `end`
+    previous = list(range(len(window) + 1))
+    for i, ch in enumerate(target, 1):
+        current = [i] + [0] * len(window)
+        for j, tc in enumerate(window, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ch != tc))
+        previous = current
+    best = min(range(len(window) + 1), key=lambda j: (previous[j], j))
+    return end - best, previous[best]
+
+
+class FuzzyPhraseMatcher:
+    """
+    Approximate matching of a whole phrase set within per-phrase edit budgets
+    (Levenshtein: insertions, deletions, substitutions). Phrases are packed side by
+    side into one bit-vector per error level and run through the Wu-Manber bitap
+    recurrence together, so each text character costs a fixed number of integer
+    operations regardless of how many phrases there are. A pigeonhole filter (every
+    match contains one of k+1 pieces of its phrase verbatim) limits the bit-parallel
+    pass to regions around candidate pieces, found with one regex. Whitespace runs
+    in phrases and text are collapsed first, so spacing does not use up the budget.
+    """
+
+    def __init__(
+        self,
+        phrases: Sequence[str],
+        max_edits: int = 2,
+        min_length: int = 12,
+        chars_per_edit: int = 6
+    ):
+        self.phrases = [collapse_whitespace(p)[0] for p in phrases]
+        self.edits = [allowed_edits(p, max_edits, min_length, chars_per_edit) for p in self.phrases]
+        self.max_k = max(self.edits, default=0)
+
+        self._masks: Dict[str, int] = {}
+        self._low = 0
+        self._top: Dict[int, int] = {}  # top bit of a phrase's segment -> phrase index
+        self._accept = [0] * (self.max_k + 1)  # top bits of phrases whose budget is d
+        self._init = [0] * (self.max_k + 1)
+        offset = 0
+        for index, (phrase, k) in enumerate(zip(self.phrases, self.edits)):
+            if not phrase:
+                continue
+            for i, ch in enumerate(phrase):
+                self._masks[ch] = self._masks.get(ch, 0) | (1 << (offset + i))
+            top = 1 << (offset + len(phrase) - 1)
+            self._low |= 1 << offset
+            self._top[top] = index
+            self._accept[k] |= top
+            for d in range(1, self.max_k + 1):
+                # Before any text, the first d phrase characters can be deleted
+                self._init[d] |= ((1 << min(d, len(phrase) - 1)) - 1) << offset
+            offset += len(phrase)
+        self._full = (1 << offset) - 1
+
+        pieces = [piece for phrase, k in zip(self.phrases, self.edits) if phrase for piece in _pieces(phrase, k)]
+        self.pieces = sorted(set(pieces), key=len, reverse=True)
+        # A whitespace-only piece would match everywhere; scan the whole text instead
+        self._filter = (
+            re.compile("|".join(re.escape(p) for p in self.pieces))
+            if self.pieces and all(self.pieces) else None
+        )
+        # Raw (uncollapsed) text holds every whitespace-free fragment of a matched piece
+        self.literals = sorted({max(piece.split(" "), key=len) for piece in self.pieces}, key=len, reverse=True)
+        # Wide enough to also cover pieces hidden inside another piece's regex match
+        self._radius = 2 * (max((len(p) for p in self.phrases), default=0) + self.max_k)
+
+    def _regions(self, text: str) -> List[Tuple[int, int]]:
+        if self._filter is None:
+            return [(0, len(text))]
+        regions: List[Tuple[int, int]] = []
+        for m in self._filter.finditer(text):
+            start, end = max(0, m.start() - self._radius), min(len(text), m.end() + self._radius)
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], end)
+            else:
+                regions.append((start, end))
+        return regions
+
+    def first_matches(self, text: str) -> Dict[int, FuzzyMatch]:
+        """Earliest match of each phrase found in `text`, keyed by phrase index; spans index `text`."""
+        collapsed, index = collapse_whitespace(text)
+        found = self._first_matches(collapsed)
+        if index is None:
+            return found
+        index.append(len(text))
+        return {
+            i: FuzzyMatch(index[m.start], index[m.end - 1] + 1 if m.end > m.start else index[m.start], m.edits)
+            for i, m in found.items()
+        }
+
+    def _first_matches(self, text: str) -> Dict[int, FuzzyMatch]:
+        found: Dict[int, FuzzyMatch] = {}
+        pending = sum(self._accept)
+        masks, low, full, accept, max_k = self._masks, self._low, self._full, self._accept, self.max_k
+        for region_start, region_end in self._regions(text):
+            states = list(self._init)
+            for j in range(region_start, region_end):
+                eq = masks.get(text[j], 0)
+                old = states[0]
+                new = ((old << 1) | low) & eq
+                states[0] = new
+                hit = new & accept[0]
+                for d in range(1, max_k + 1):
+                    # match | insertion | substitution and deletion
+                    current = states[d]
+                    new = (((current << 1) | low) & eq) | old | ((((old | new) << 1) | low) & full)
+                    states[d] = new
+                    old = current
+                    hit |= new & accept[d]
+                hit &= pending
+                if not hit:
+                    continue
+                pending &= ~hit
+                while hit:
+                    top = hit & -hit
+                    hit ^= top
+                    index = self._top[top]
+                    start, edits = _match_start(text, j + 1, self.phrases[index], self.edits[index])
+                    found[index] = FuzzyMatch(start, j + 1, edits)
+                if not pending:
+                    return found
+        return found
@@ -0,0 +1,245 @@
+import csv
+import hashlib
+import re
+import string
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .shared import MAGIC, load_arrays, save_arrays
+from .text import TextView, as_view, fold
+
+_TOKEN = re.compile(r"\S+")
+_EDGE_PUNCTUATION = string.punctuation + "“”‘’«»¡¿…"
+
+
+class LexiconMatch(NamedTuple):
+    term: str
+    severity: int
+    category: str
+    start: int  # offsets into the view's folded form
+    end: int
+
+
+def _key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def lexicon_tokens(folded: str) -> List[Tuple[str, int, int]]:
+    """Whitespace tokens of a folded string with edge punctuation stripped, plus spans."""
+    tokens = []
+    for m in _TOKEN.finditer(folded):
+        word = m.group()
+        stripped = word.strip(_EDGE_PUNCTUATION)
+        if not stripped:
+            continue
+        start = m.start() if stripped is word else m.start() + word.index(stripped)
+        tokens.append((stripped, start, start + len(stripped)))
+    return tokens
+
+
+class Lexicon:
+    """
+    Compact term table for large word lists. Terms (one or more words) are folded
+    like TextView.folded and stored as a string table sorted by a 64-bit hash of the
+    term, with parallel severity/category columns. Lookup hashes every token n-gram
+    of a text (n <= longest term) and resolves them all with one searchsorted, then
+    verifies candidates byte-for-byte. Saved lexicons are memory-mapped, so loading
+    is instant and workers share the pages.
+    """
+
+    def __init__(
+        self,
+        hashes: np.ndarray,
+        offsets: np.ndarray,
+        blob: np.ndarray,
+        severity: np.ndarray,
+        category: np.ndarray,
+        categories: List[str],
+        max_words: int
+    ):
+        self.hashes = hashes
+        self.offsets = offsets
+        self.blob = blob
+        self.severity = severity
+        self.category = category
+        self.categories = list(categories)
+        self.max_words = max_words
+        self._fingerprint: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, int, str]]) -> "Lexicon":
+        """Builds from (term, severity, category); duplicate terms keep the highest severity."""
+        terms: Dict[bytes, Tuple[int, str]] = {}
+        max_words = 1
+        for term, severity, category in entries:
+            words = [w for w, _, _ in lexicon_tokens(fold(term))]
+            if not words:
+                continue
+            max_words = max(max_words, len(words))
+            key = " ".join(words).encode("utf-8")
+            if key not in terms or severity > terms[key][0]:
+                terms[key] = (int(severity), category)
+
+        categories = sorted({category for _, category in terms.values()})
+        category_ids = {c: i for i, c in enumerate(categories)}
+        keys = sorted(terms, key=_key_hash)
+        hashes = np.fromiter((_key_hash(k) for k in keys), dtype=np.uint64, count=len(keys))
+        if len(np.unique(hashes)) != len(hashes):
+            raise ValueError("Lexicon term hash collision; rename or drop one of the colliding terms")
+        lengths = np.fromiter((len(k) for k in keys), dtype=np.int64, count=len(keys))
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        blob = np.frombuffer(b"".join(keys), dtype=np.uint8).copy()
+        return cls(
+            hashes,
+            offsets,
+            blob,
+            np.asarray([terms[k][0] for k in keys], dtype=np.int8),
+            np.asarray([category_ids[terms[k][1]] for k in keys], dtype=np.uint16),
+            categories,
+            max_words
+        )
+
+    @classmethod
+    def from_file(cls, path: str, severity: int = 5, category: str = "CONTENT_SAFETY") -> "Lexicon":
+        """
+        Reads a term list: one term per line, optionally tab-separated
+        `term<TAB>severity<TAB>category` (.tsv/.txt) or a CSV with term[,severity[,category]]
+        columns. Blank lines and lines starting with '#' are skipped.
+        """
+        delimiter = "," if path.lower().endswith(".csv") else "\t"
+
+        def entries():
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                for row in csv.reader(f, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL):
+                    if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                        continue
+                    if row[0].strip().lower() == "term" and len(row) > 1:
+                        continue  # header
+                    yield (
+                        row[0],
+                        int(row[1]) if len(row) > 1 and row[1].strip() else severity,
+                        row[2].strip() if len(row) > 2 and row[2].strip() else category
+                    )
+
+        return cls.build(entries())
+
+    def save(self, path: str) -> None:
+        save_arrays(path, {
+            "hashes": self.hashes,
+            "offsets": self.offsets,
+            "blob": self.blob,
+            "severity": self.severity,
+            "category": self.category,
+        }, meta={"kind": "lexicon", "categories": self.categories, "max_words": self.max_words})
+
+    @classmethod
+    def load(cls, path: str) -> "Lexicon":
+        arrays, meta = load_arrays(path)
+        if meta.get("kind") != "lexicon":
+            raise ValueError(f"{path} is not a lexicon file")
+        return cls(categories=meta["categories"], max_words=meta["max_words"], **arrays)
+
+    @classmethod
+    def open(cls, path: str) -> "Lexicon":
+        """Maps a saved lexicon, or builds one from a term list file."""
+        with open(path, "rb") as f:
+            is_saved = f.read(len(MAGIC)) == MAGIC
+        return cls.load(path) if is_saved else cls.from_file(path)
+
+    @property
+    def max_term_length(self) -> int:
+        """Longest term in UTF-8 bytes (an upper bound on its length in characters)."""
+        return int(np.diff(self.offsets).max()) if len(self.hashes) else 0
+
+    def term(self, index: int) -> str:
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for array in (self.hashes, self.offsets, self.blob, self.severity, self.category):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            digest.update(repr(self.categories).encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _find(self, keys: List[bytes]) -> np.ndarray:
+        """Term index for each key, or -1."""
+        probe = np.fromiter((_key_hash(k) for k in keys), dtype=np.uint64, count=len(keys))
+        idx = np.minimum(np.searchsorted(self.hashes, probe), len(self.hashes) - 1)
+        found = np.full(len(keys), -1, dtype=np.int64)
+        for slot in np.flatnonzero(self.hashes[idx] == probe):
+            index = int(idx[slot])
+            if bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]) == keys[slot]:
+                found[slot] = index
+        return found
+
+    def _lookup_words(self, folded: str) -> List[LexiconMatch]:
+        # Single-word terms: resolve the distinct tokens first, then locate only the
+        # matching ones with one regex, keeping per-token work out of Python
+        stripped = {word: word.strip(_EDGE_PUNCTUATION) for word in set(folded.split())}
+        candidates = [word for word, key in stripped.items() if key]
+        if not candidates:
+            return []
+        found = self._find([stripped[word].encode("utf-8", "surrogatepass") for word in candidates])
+        hits = {word: int(index) for word, index in zip(candidates, found) if index >= 0}
+        if not hits:
+            return []
+        pattern = re.compile(
+            r"(?<!\S)(?:" + "|".join(re.escape(w) for w in sorted(hits, key=len, reverse=True)) + r")(?!\S)"
+        )
+        matches = []
+        for m in pattern.finditer(folded):
+            word, index = m.group(), hits[m.group()]
+            start = m.start() + word.index(stripped[word])
+            matches.append(LexiconMatch(
+                self.term(index),
+                int(self.severity[index]),
+                self.categories[int(self.category[index])],
+                start,
+                start + len(stripped[word])
+            ))
+        return matches
+
+    def lookup(self, text: Union[str, TextView]) -> List[LexiconMatch]:
+        """All whole-word and multi-word term occurrences, in text order."""
+        if not len(self.hashes):
+            return []
+        folded = as_view(text).folded
+        if self.max_words == 1:
+            return self._lookup_words(folded)
+        tokens = lexicon_tokens(folded)
+        # Text repeats a small vocabulary: hash and probe each distinct n-gram once
+        slots: Dict[str, int] = {}
+        occurrences: List[int] = []
+        spans: List[Tuple[int, int]] = []
+        for i in range(len(tokens)):
+            key = tokens[i][0]
+            for n in range(self.max_words):
+                if i + n >= len(tokens):
+                    break
+                if n:
+                    key = f"{key} {tokens[i + n][0]}"
+                occurrences.append(slots.setdefault(key, len(slots)))
+                spans.append((tokens[i][1], tokens[i + n][2]))
+        if not slots:
+            return []
+
+        found = self._find([key.encode("utf-8", "surrogatepass") for key in slots])
+        matches = []
+        occurrence_index = found[np.asarray(occurrences, dtype=np.int64)]
+        for j in np.flatnonzero(occurrence_index >= 0):
+            index = int(occurrence_index[j])
+            matches.append(LexiconMatch(
+                self.term(index),
+                int(self.severity[index]),
+                self.categories[int(self.category[index])],
+                spans[j][0],
+                spans[j][1]
+            ))
+        return matches
@@ -0,0 +1,378 @@
+import asyncio
+import codecs
+import io
+import json
+import logging
+import re
+from concurrent.futures import Executor
+from typing import Any, List, Optional, Sequence, Tuple
+
+from .models import GuardrailAction, GuardrailResult
+
+DEFAULT_FIELDS = ("messages[].content", "messages[].content[].text", "prompt", "input")
+GUARDED_METHODS = ("POST", "PUT", "PATCH")
+# Sent when sanitized fields cannot be written back; failing open would forward them raw
+UNPROCESSABLE_BODY = b'{"error": {"type": "unprocessable_body"}}'
+
+Path = Tuple[Any, ...]
+
+_STRUCTURAL = re.compile(r'["{}\[\]:,]')
+_STRING_STOP = re.compile(r'["\\]')
+
+
+def parse_field(field: str) -> Path:
+    """'messages[].content' -> ('messages', '[]', 'content'); '[]' matches any index."""
+    parts: List[str] = []
+    for piece in field.split("."):
+        name, brackets = re.match(r"^([^\[]*)((?:\[\])*)$", piece).groups()
+        if name:
+            parts.append(name)
+        parts.extend("[]" for _ in range(len(brackets) // 2))
+    return tuple(parts)
+
+
+class JsonFieldExtractor:
+    """
+    Incremental JSON scanner that yields (path, value) for string values at the
+    configured field paths as soon as each string closes, so validation can start
+    while the rest of the body is still arriving. Only keys and matching values are
+    buffered; the document is not otherwise parsed or validated. UTF-16 and UTF-32
+    bodies are detected as json.loads() does, so they cannot slip past as garbage.
+    """
+
+    def __init__(self, fields: Sequence[str] = DEFAULT_FIELDS):
+        self.patterns = [parse_field(f) for f in fields]
+        # Chosen from the first 4 bytes like json.loads(bytes): UTF-8, -16 or -32
+        self._decoder: Optional[codecs.IncrementalDecoder] = None
+        self._head = b""
+        # Frames: [kind ('{' or '['), key or index, expecting_key]
+        self._stack: List[list] = []
+        self._in_string = False
+        self._escape = False
+        self._capture: Optional[List[str]] = None
+        self._is_key = False
+
+    def _matches(self) -> bool:
+        path = [frame[1] for frame in self._stack]
+        for pattern in self.patterns:
+            if len(pattern) == len(path) and all(
+                (p == "[]" and isinstance(k, int)) or p == k for p, k in zip(pattern, path)
+            ):
+                return True
+        return False
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Tuple[Path, str]]:
+        if self._decoder is None:
+            self._head += chunk
+            if len(self._head) < 4 and not final:
+                return []
+            encoding = json.detect_encoding(self._head)
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            chunk, self._head = self._head, b""
+        text = self._decoder.decode(chunk, final)
+        found: List[Tuple[Path, str]] = []
+        pos, end = 0, len(text)
+        while pos < end:
+            if self._in_string:
+                if self._escape:
+                    if self._capture is not None:
+                        self._capture.append(text[pos])
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = _STRING_STOP.search(text, pos)
+                stop = match.start() if match else end
+                if self._capture is not None:
+                    self._capture.append(text[pos:stop])
+                if not match:
+                    break
+                if match.group() == "\\":
+                    if self._capture is not None:
+                        self._capture.append("\\")
+                    self._escape = True
+                else:
+                    self._close_string(found)
+                pos = stop + 1
+                continue
+
+            match = _STRUCTURAL.search(text, pos)
+            if not match:
+                break
+            ch = match.group()
+            pos = match.end()
+            top = self._stack[-1] if self._stack else None
+            if ch == '"':
+                self._in_string = True
+                self._is_key = top is not None and top[0] == "{" and top[2]
+                self._capture = [] if self._is_key or self._matches() else None
+            elif ch == "{":
+                self._stack.append(["{", None, True])
+            elif ch == "[":
+                self._stack.append(["[", 0, False])
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif ch == ":" and top is not None:
+                top[2] = False
+            elif ch == "," and top is not None:
+                if top[0] == "{":
+                    top[2] = True
+                else:
+                    top[1] += 1
+        return found
+
+    def _close_string(self, found: List[Tuple[Path, str]]) -> None:
+        self._in_string = False
+        if self._capture is None:
+            return
+        try:
+            value = json.loads('"' + "".join(self._capture) + '"')
+        except ValueError:
+            value = "".join(self._capture)
+        self._capture = None
+        if self._is_key:
+            self._stack[-1][1] = value
+        else:
+            found.append((tuple(frame[1] for frame in self._stack), value))
+
+
+class _Guard:
+    """Policy logic shared by the ASGI and WSGI middleware."""
+
+    def __init__(self, engine, fields: Sequence[str], max_body_size: int, block_status: int):
+        self.engine = engine
+        self.fields = tuple(fields)
+        self.max_body_size = max_body_size
+        self.block_status = block_status
+
+    @staticmethod
+    def applies(method: str) -> bool:
+        # Not gated on Content-Type: frameworks parse JSON from text/plain or untyped bodies too
+        return method.upper() in GUARDED_METHODS
+
+    @staticmethod
+    def blocked(results: Sequence[GuardrailResult]) -> Optional[GuardrailResult]:
+        return next((r for r in results if r.action == GuardrailAction.BLOCK), None)
+
+    def block_body(self, result: GuardrailResult) -> bytes:
+        return json.dumps({
+            "error": {
+                "type": "guardrails_blocked",
+                "message": result.message_to_user or "Input blocked by security policy.",
+                "risk_score": result.risk_score,
+                "findings": [f.model_dump() for f in result.findings],
+            }
+        }).encode("utf-8")
+
+    @staticmethod
+    def rewrite(body: bytes, fields: Sequence[Path], results: Sequence[GuardrailResult]) -> Optional[bytes]:
+        """
+        Returns the body with sanitized field values, or None if nothing changed.
+        Raises ValueError if a sanitized field cannot be written back; the raw body
+        must then not be forwarded.
+        """
+        replacements = [
+            (path, r.safe_text) for path, r in zip(fields, results)
+            if r.action == GuardrailAction.SANITIZE and r.safe_text is not None
+        ]
+        if not replacements:
+            return None
+        try:
+            document = json.loads(body)
+            for path, safe_text in replacements:
+                target = document
+                for key in path[:-1]:
+                    target = target[key]
+                target[path[-1]] = safe_text
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            logging.warning(f"Could not rewrite sanitized request body: {e}")
+            raise ValueError("sanitized request body could not be rewritten") from e
+        return json.dumps(document, ensure_ascii=False).encode("utf-8")
+
+
+class GuardrailsASGIMiddleware:
+    """
+    ASGI middleware that validates configured JSON fields of request bodies on
+    POST/PUT/PATCH, whatever their Content-Type (bodies without matching fields
+    pass through after buffering, up to `max_body_size`). Fields are validated on `executor` (the loop's default pool if None) as they
+    stream in, keeping the event loop free. BLOCK answers with `block_status`;
+    SANITIZE forwards a rewritten body. The body is held until every field is
+    validated, since nothing may reach the app before the verdict.
+    """
+
+    def __init__(
+        self,
+        app,
+        engine,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        executor: Optional[Executor] = None,
+        max_body_size: int = 1 << 20,
+        block_status: int = 400
+    ):
+        self.app = app
+        self.executor = executor
+        self.guard = _Guard(engine, fields, max_body_size, block_status)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if not self.guard.applies(scope.get("method", "GET")):
+            return await self.app(scope, receive, send)
+
+        loop = asyncio.get_running_loop()
+        extractor = JsonFieldExtractor(self.guard.fields)
+        paths: List[Path] = []
+        pending: List[asyncio.Future] = []
+        chunks: List[bytes] = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                for future in pending:
+                    future.cancel()
+                return
+            chunk = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            size += len(chunk)
+            if size > self.guard.max_body_size:
+                for future in pending:
+                    future.cancel()
+                return await _asgi_respond(send, 413, b'{"error": {"type": "request_too_large"}}')
+            chunks.append(chunk)
+            for path, value in extractor.feed(chunk, final=not more_body):
+                paths.append(path)
+                pending.append(loop.run_in_executor(self.executor, self.guard.engine.validate_input, value))
+
+        results = await asyncio.gather(*pending)
+        body = b"".join(chunks)
+        blocked = self.guard.blocked(results)
+        if blocked is not None:
+            return await _asgi_respond(send, self.guard.block_status, self.guard.block_body(blocked))
+
+        try:
+            rewritten = self.guard.rewrite(body, paths, results)
+        except ValueError:
+            return await _asgi_respond(send, 422, UNPROCESSABLE_BODY)
+        if rewritten is not None:
+            body = rewritten
+            scope = dict(scope)
+            scope["headers"] = [
+                (k, v) for k, v in scope.get("headers", []) if k.lower() != b"content-length"
+            ] + [(b"content-length", str(len(body)).encode("latin-1"))]
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return await self.app(scope, replay_receive, send)
+
+
+async def _asgi_respond(send, status: int, body: bytes) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+_REASONS = {400: "Bad Request", 403: "Forbidden", 413: "Payload Too Large", 422: "Unprocessable Entity"}
+
+
+class GuardrailsWSGIMiddleware:
+    """
+    WSGI counterpart of GuardrailsASGIMiddleware. The body is read in chunks and
+    fields extracted as they complete; with an `executor`, their validation
+    overlaps the remaining reads.
+    """
+
+    def __init__(
+        self,
+        app,
+        engine,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        executor: Optional[Executor] = None,
+        max_body_size: int = 1 << 20,
+        block_status: int = 400,
+        chunk_size: int = 64 * 1024
+    ):
+        self.app = app
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self.guard = _Guard(engine, fields, max_body_size, block_status)
+
+    def __call__(self, environ, start_response):
+        if not self.guard.applies(environ.get("REQUEST_METHOD", "GET")):
+            return self.app(environ, start_response)
+        # Without a Content-Length (chunked upload, wsgi.input_terminated) read to EOF
+        try:
+            length: Optional[int] = int(environ["CONTENT_LENGTH"]) if environ.get("CONTENT_LENGTH") else None
+        except ValueError:
+            length = None
+        if length is not None and length > self.guard.max_body_size:
+            return self._respond(start_response, 413, b'{"error": {"type": "request_too_large"}}')
+
+        stream = environ["wsgi.input"]
+        extractor = JsonFieldExtractor(self.guard.fields)
+        paths: List[Path] = []
+        pending: List[Any] = []
+        chunks: List[bytes] = []
+        size = 0
+        while length is None or size < length:
+            want = self.chunk_size if length is None else min(self.chunk_size, length - size)
+            chunk = stream.read(want)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > self.guard.max_body_size:
+                self._cancel(pending)
+                return self._respond(start_response, 413, b'{"error": {"type": "request_too_large"}}')
+            chunks.append(chunk)
+            self._validate(extractor.feed(chunk, final=length is not None and size >= length), paths, pending)
+        if length is not None and size < length:
+            # Never forward a truncated body
+            self._cancel(pending)
+            return self._respond(start_response, 400, b'{"error": {"type": "incomplete_body"}}')
+        if length is None:
+            self._validate(extractor.feed(b"", final=True), paths, pending)
+        results = [p.result() if self.executor is not None else p for p in pending]
+        body = b"".join(chunks)
+
+        blocked = self.guard.blocked(results)
+        if blocked is not None:
+            return self._respond(start_response, self.guard.block_status, self.guard.block_body(blocked))
+
+        try:
+            body = self.guard.rewrite(body, paths, results) or body
+        except ValueError:
+            return self._respond(start_response, 422, UNPROCESSABLE_BODY)
+        environ["wsgi.input"] = io.BytesIO(body)
+        environ["CONTENT_LENGTH"] = str(len(body))
+        return self.app(environ, start_response)
+
+    def _validate(self, found: List[Tuple[Path, str]], paths: List[Path], pending: List[Any]) -> None:
+        for path, value in found:
+            paths.append(path)
+            if self.executor is not None:
+                pending.append(self.executor.submit(self.guard.engine.validate_input, value))
+            else:
+                pending.append(self.guard.engine.validate_input(value))
+
+    def _cancel(self, pending: List[Any]) -> None:
+        if self.executor is not None:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _respond(start_response, status: int, body: bytes):
+        start_response(
+            f"{status} {_REASONS.get(status, 'Error')}",
+            [("Content-Type", "application/json"), ("Content-Length", str(len(body)))]
+        )
+        return [body]
@@ -0,0 +1,190 @@
+import hashlib
+import re
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from .ml.tokenizer import fnv1a_32_batch
+from .shared import load_arrays, save_arrays
+from .text import TextView, as_view
+
+_WORD_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+class KnownAttackMatch(NamedTuple):
+    index: int
+    label: str
+    similarity: float
+
+
+def shingles(text: Union[str, TextView], size: int = 2) -> List[bytes]:
+    """Word n-grams of the folded text; texts shorter than `size` words give one shingle."""
+    words = _WORD_SPLIT.sub(" ", as_view(text).folded).split()
+    if not words:
+        return []
+    if len(words) <= size:
+        return [" ".join(words).encode("utf-8")]
+    return list({" ".join(words[i:i + size]).encode("utf-8") for i in range(len(words) - size + 1)})
+
+
+class KnownAttackIndex:
+    """
+    MinHash/LSH index over a corpus of known attack prompts.
+
+    Each prompt's word shingles are MinHashed into `num_perm` values; banding them
+    (`bands` x num_perm/bands rows) gives bucket keys kept in one sorted array, so a
+    query costs one vectorized binary search plus its candidates, independent of
+    corpus size. Candidates are verified against a 1-byte-per-value
+    signature (b-bit MinHash) to estimate Jaccard similarity. Saved indexes are
+    memory-mapped.
+    """
+
+    def __init__(
+        self,
+        seeds: np.ndarray,
+        band_keys: np.ndarray,
+        band_docs: np.ndarray,
+        sketches: np.ndarray,
+        label_offsets: np.ndarray,
+        label_blob: np.ndarray,
+        shingle_size: int = 2,
+        bands: int = 32
+    ):
+        self.seeds = seeds
+        self.band_keys = band_keys
+        self.band_docs = band_docs
+        self.sketches = sketches
+        self.label_offsets = label_offsets
+        self.label_blob = label_blob
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def num_perm(self) -> int:
+        return len(self.seeds)
+
+    def __len__(self) -> int:
+        return len(self.sketches)
+
+    def _signatures(self, docs: Sequence[Sequence[bytes]]) -> np.ndarray:
+        """(len(docs), num_perm) MinHash signatures; every doc must have shingles."""
+        lengths = np.fromiter((len(d) for d in docs), dtype=np.int64, count=len(docs))
+        x = fnv1a_32_batch([item for d in docs for item in d])
+        # One seeded murmur3 finalizer per permutation; linear (a*x + b) mod p hashes
+        # restricted to 64-bit arithmetic skew the MinHash estimate badly
+        h = x[None, :] ^ self.seeds[:, None]
+        h ^= h >> np.uint32(16)
+        h *= np.uint32(0x85EBCA6B)
+        h ^= h >> np.uint32(13)
+        h *= np.uint32(0xC2B2AE35)
+        h ^= h >> np.uint32(16)
+        starts = np.cumsum(lengths) - lengths
+        return np.minimum.reduceat(h, starts, axis=1).T
+
+    @staticmethod
+    def _band_keys(signatures: np.ndarray, bands: int) -> np.ndarray:
+        # (n, num_perm) -> (n, bands) keys: band number in the high 32 bits, a mix of
+        # the band's rows in the low 32, so all bands share one sorted array
+        n = len(signatures)
+        grouped = signatures.reshape(n, bands, -1)
+        h = np.full((n, bands), 0x811C9DC5, dtype=np.uint32)
+        for row in range(grouped.shape[2]):
+            h = (h ^ grouped[:, :, row]) * np.uint32(0x01000193)
+        return (np.arange(bands, dtype=np.uint64) << np.uint64(32)) | h.astype(np.uint64)
+
+    @classmethod
+    def build(
+        cls,
+        texts: Iterable[str],
+        labels: Optional[Iterable[str]] = None,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 2,
+        seed: int = 1
+    ) -> "KnownAttackIndex":
+        """
+        Indexes `texts`; `labels` (default: the first 60 characters of each text)
+        are reported with matches. Empty texts are skipped.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        texts = list(texts)
+        labels = list(labels) if labels is not None else [text[:60] for text in texts]
+        if len(labels) != len(texts):
+            raise ValueError(f"Got {len(labels)} labels for {len(texts)} texts")
+        seeds = np.random.default_rng(seed).integers(0, 1 << 32, num_perm, dtype=np.uint64).astype(np.uint32)
+        index = cls(seeds, np.zeros(0, np.uint64), np.zeros(0, np.int32), np.zeros((0, num_perm), np.uint8),
+                    np.zeros(1, np.int64), np.zeros(0, np.uint8), shingle_size)
+
+        docs, names = [], []
+        for text, label in zip(texts, labels):
+            items = shingles(text, shingle_size)
+            if items:
+                docs.append(items)
+                names.append(label.encode("utf-8"))
+
+        # Chunked so the (num_perm, shingles) hash matrix stays small
+        signatures = np.zeros((len(docs), num_perm), dtype=np.uint32)
+        for start in range(0, len(docs), 2048):
+            signatures[start:start + 2048] = index._signatures(docs[start:start + 2048])
+
+        keys = cls._band_keys(signatures, bands).ravel()
+        order = np.argsort(keys, kind="stable")
+        index.band_keys = keys[order]
+        index.band_docs = (order // bands).astype(np.int32)
+        index.bands = bands
+        index.sketches = (signatures & 0xFF).astype(np.uint8)
+        index.label_offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum([len(n) for n in names], out=index.label_offsets[1:])
+        index.label_blob = np.frombuffer(b"".join(names), dtype=np.uint8).copy()
+        return index
+
+    def save(self, path: str) -> None:
+        save_arrays(path, {
+            "seeds": self.seeds,
+            "band_keys": self.band_keys,
+            "band_docs": self.band_docs,
+            "sketches": self.sketches,
+            "label_offsets": self.label_offsets,
+            "label_blob": self.label_blob,
+        }, meta={"kind": "known_attacks", "shingle_size": self.shingle_size, "bands": self.bands})
+
+    @classmethod
+    def load(cls, path: str) -> "KnownAttackIndex":
+        arrays, meta = load_arrays(path)
+        if meta.get("kind") != "known_attacks":
+            raise ValueError(f"{path} is not a known-attack index")
+        return cls(shingle_size=meta["shingle_size"], bands=meta["bands"], **arrays)
+
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            digest = hashlib.sha256(repr((self.shingle_size, self.bands)).encode("utf-8"))
+            for array in (self.seeds, self.band_keys, self.band_docs,
+                          self.sketches, self.label_offsets, self.label_blob):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def label(self, index: int) -> str:
+        return bytes(self.label_blob[self.label_offsets[index]:self.label_offsets[index + 1]]).decode("utf-8")
+
+    def query(self, text: Union[str, TextView], threshold: float = 0.5, limit: int = 3) -> List[KnownAttackMatch]:
+        """Known attacks whose estimated Jaccard similarity to `text` is >= threshold, best first."""
+        items = shingles(text, self.shingle_size)
+        if not items or not len(self):
+            return []
+        signature = self._signatures([items])[0]
+        probe = self._band_keys(signature[None, :], self.bands)[0]
+        lo = np.searchsorted(self.band_keys, probe, side="left")
+        hi = np.searchsorted(self.band_keys, probe, side="right")
+        if not (hi > lo).any():
+            return []
+        docs = np.unique(np.concatenate([self.band_docs[a:b] for a, b in zip(lo, hi) if b > a]))
+
+        # b-bit MinHash (b=8): P(low bytes equal) = J + (1 - J) / 256
+        equal = (self.sketches[docs] == (signature & 0xFF).astype(np.uint8)).mean(axis=1)
+        similarity = np.clip((equal - 1 / 256) / (1 - 1 / 256), 0.0, 1.0)
+        keep = np.flatnonzero(similarity >= threshold)
+        best = keep[np.argsort(-similarity[keep], kind="stable")][:limit]
+        return [KnownAttackMatch(int(docs[i]), self.label(int(docs[i])), float(similarity[i])) for i in best]
@@ -1,4 +1,5 @@
-from .tokenizer import Md5HashTokenizer
+from .tokenizer import Md5HashTokenizer, FnvHashTokenizer
 from .onnx_classifier import OnnxJailbreakClassifier
+from .cascade import CascadeClassifier, CascadeStage
 
-__all__ = ["Md5HashTokenizer", "OnnxJailbreakClassifier"]
+__all__ = ["Md5HashTokenizer", "FnvHashTokenizer", "OnnxJailbreakClassifier", "CascadeClassifier", "CascadeStage"]
@@ -0,0 +1,105 @@
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .onnx_classifier import OnnxJailbreakClassifier
+
+
+def model_size_bytes(model_path: str) -> int:
+    """Size of an ONNX model including its external-data sibling (`<model>.data`)."""
+    return sum(os.path.getsize(p) for p in (model_path, f"{model_path}.data") if os.path.exists(p))
+
+
+def _percentiles(seconds: List[float]) -> Dict[str, float]:
+    ms = np.asarray(seconds, dtype=np.float64) * 1000.0
+    return {"p50_ms": float(np.percentile(ms, 50)), "p95_ms": float(np.percentile(ms, 95))}
+
+
+def benchmark_onnx(
+    model_path: str,
+    texts: Sequence[str],
+    labels: Optional[Sequence[int]] = None,
+    batch_size: int = 64,
+    single_runs: int = 200,
+    batch_runs: int = 20,
+    warmup: int = 5
+) -> dict:
+    """
+    Latency report for an exported classifier, measured through
+    OnnxJailbreakClassifier so tokenization is included as in serving:
+    single-text predict() and predict_batch() of `batch_size` texts (p50/p95 ms),
+    batched throughput, and on-disk size. With `labels` (1 = jailbreak), also the
+    accuracy of the exported model over all `texts`.
+    """
+    if not texts:
+        raise ValueError("benchmark_onnx needs at least one text")
+    classifier = OnnxJailbreakClassifier(model_path, batch_size=batch_size)
+    if classifier.session is None:
+        raise RuntimeError(f"Could not load ONNX model {model_path}")
+
+    texts = list(texts)
+    for text in texts[:warmup]:
+        classifier.predict(text)
+    classifier.predict_batch(texts[:batch_size])
+
+    single = []
+    for i in range(single_runs):
+        text = texts[i % len(texts)]
+        start = time.perf_counter()
+        classifier.predict(text)
+        single.append(time.perf_counter() - start)
+
+    batched = []
+    for i in range(batch_runs):
+        offset = (i * batch_size) % len(texts)
+        batch = (texts[offset:] + texts)[:batch_size]
+        start = time.perf_counter()
+        classifier.predict_batch(batch)
+        batched.append(time.perf_counter() - start)
+
+    single_stats = _percentiles(single)
+    batch_stats = _percentiles(batched)
+    report = {
+        "model": model_path,
+        "size_bytes": model_size_bytes(model_path),
+        "single_p50_ms": single_stats["p50_ms"],
+        "single_p95_ms": single_stats["p95_ms"],
+        "batch_size": batch_size,
+        "batch_p50_ms": batch_stats["p50_ms"],
+        "batch_p95_ms": batch_stats["p95_ms"],
+        "batch_texts_per_second": batch_size / float(np.median(batched)),
+    }
+    if labels is not None:
+        probabilities = classifier.predict_batch(texts)
+        predicted = probabilities >= classifier.threshold
+        report["accuracy"] = float((predicted == (np.asarray(labels) == 1)).mean())
+    return report
+
+
+def pareto_front(
+    rows: Sequence[dict],
+    maximize: Sequence[str] = ("accuracy",),
+    minimize: Sequence[str] = ("single_p95_ms", "size_bytes")
+) -> List[dict]:
+    """
+    Rows not dominated by any other row: no other row is at least as good on every
+    metric and strictly better on one. Returned best-first by the first `maximize`
+    metric.
+    """
+    def as_costs(row):
+        return [-row[k] for k in maximize] + [row[k] for k in minimize]
+
+    costs = [as_costs(row) for row in rows]
+    front = []
+    for i, row in enumerate(rows):
+        dominated = any(
+            all(o <= c for o, c in zip(other, costs[i])) and any(o < c for o, c in zip(other, costs[i]))
+            for j, other in enumerate(costs) if j != i
+        )
+        if not dominated:
+            front.append(row)
+    if maximize:
+        front.sort(key=lambda row: row[maximize[0]], reverse=True)
+    return front
@@ -0,0 +1,110 @@
+import hashlib
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..text import TextView
+
+
+class CascadeStage:
+    """
+    One classifier in a cascade. Its score is final when it falls outside the
+    (low, high) confidence band; scores inside the band escalate to the next stage.
+    The last stage's band is ignored.
+    """
+
+    def __init__(self, classifier, low: float = 0.1, high: float = 0.9, name: Optional[str] = None):
+        if not 0.0 <= low <= high <= 1.0:
+            raise ValueError(f"Invalid confidence band ({low}, {high})")
+        self.classifier = classifier
+        self.low = low
+        self.high = high
+        self.name = name or type(classifier).__name__
+        self.calls = 0
+        self.texts = 0
+        self.escalated = 0
+        self.seconds = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "texts": self.texts,
+            "escalated": self.escalated,
+            "escalation_rate": self.escalated / self.texts if self.texts else 0.0,
+            "mean_batch_ms": 1000 * self.seconds / self.calls if self.calls else 0.0,
+            "mean_text_ms": 1000 * self.seconds / self.texts if self.texts else 0.0,
+        }
+
+
+class CascadeClassifier:
+    """
+    Runs classifiers cheapest-first: each stage only sees the texts every earlier
+    stage was unsure about, so an expensive model costs in proportion to the
+    ambiguous share of traffic. Drop-in for OnnxJailbreakClassifier.
+
+    A stage whose model is unavailable (predict_batch returns None) is skipped.
+    """
+
+    def __init__(self, stages: List[CascadeStage], threshold: float = 0.5):
+        if not stages:
+            raise ValueError("A cascade needs at least one stage")
+        self.stages = stages
+        self.threshold = threshold
+        self._lock = threading.Lock()
+
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256(type(self).__qualname__.encode("utf-8"))
+        for stage in self.stages:
+            stage_fp = getattr(stage.classifier, "fingerprint", None)
+            digest.update((stage_fp() if stage_fp else type(stage.classifier).__qualname__).encode("utf-8"))
+            digest.update(repr((stage.low, stage.high)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def predict(self, text: Union[str, TextView]) -> Tuple[bool, float]:
+        """
+        Returns (is_jailbreak, probability)
+        """
+        probabilities = self.predict_batch([text])
+        if probabilities is None:
+            return False, 0.0
+        probability = float(probabilities[0])
+        return probability >= self.threshold, probability
+
+    def predict_batch(self, texts: Sequence[Union[str, TextView]]) -> Optional[np.ndarray]:
+        """
+        Returns jailbreak probabilities aligned with `texts`, each taken from the
+        first stage confident about it (or the last stage that ran), or None if no
+        stage is available.
+        """
+        probabilities = np.zeros(len(texts), dtype=np.float32)
+        pending = np.arange(len(texts))
+        scored = False
+        last = len(self.stages) - 1
+        for i, stage in enumerate(self.stages):
+            if not len(pending):
+                break
+            batch = [texts[j] for j in pending]
+            started = time.perf_counter()
+            result = stage.classifier.predict_batch(batch)
+            elapsed = time.perf_counter() - started
+            if result is None:
+                continue
+            result = np.asarray(result, dtype=np.float32)
+            probabilities[pending] = result
+            scored = True
+
+            unsure = (result > stage.low) & (result < stage.high) if i < last else np.zeros(len(result), bool)
+            with self._lock:
+                stage.calls += 1
+                stage.texts += len(pending)
+                stage.escalated += int(unsure.sum())
+                stage.seconds += elapsed
+            pending = pending[unsure]
+        return probabilities if scored else None
+
+    def stats(self) -> List[dict]:
+        """Per-stage counts, escalation rate and latency since construction."""
+        with self._lock:
+            return [stage.stats() for stage in self.stages]
@@ -1,5 +1,7 @@
+import hashlib
 import logging
-from typing import Optional, Tuple
+import os
+from typing import Optional, Sequence, Tuple, Union
 
 try:
     import onnxruntime as ort
@@ -8,24 +10,87 @@ except ImportError:
     ort = None
     np = None
 
-from .tokenizer import Md5HashTokenizer
+from ..text import TextView
+from .tokenizer import Md5HashTokenizer, TOKENIZER_METADATA_KEY, tokenizer_for
 
 class OnnxJailbreakClassifier:
-    def __init__(self, model_path: str):
+    def __init__(
+        self,
+        model_path: str,
+        batch_size: int = 256,
+        shared_weights: bool = False,
+        threshold: float = 0.5,
+        tokenizer=None
+    ):
+        """
+        shared_weights: keep weights stored as ONNX external data (`.onnx.data`) mapped
+        from the file instead of copied into per-process buffers, so prefork workers
+        share one resident copy through the page cache.
+        tokenizer: override the tokenizer named in the model's metadata
+        (`safellmkit.tokenizer`); models without it use Md5HashTokenizer.
+        """
         self.model_path = model_path
+        self.batch_size = batch_size
+        self.threshold = threshold
+        self.shared_weights = shared_weights
         self.session = None
         self.tokenizer = None
         
         if ort:
             try:
-                self.session = ort.InferenceSession(model_path)
-                self.tokenizer = Md5HashTokenizer()
+                options = ort.SessionOptions()
+                # Batched runs trip a static-shape warning on exported models; keep errors only
+                options.log_severity_level = 3
+                if shared_weights:
+                    # onnxruntime maps external-data tensors straight from disk; prepacking
+                    # and layout rewrites would copy them into private anonymous memory
+                    options.add_session_config_entry("session.disable_prepacking", "1")
+                    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_BASIC
+                self.session = ort.InferenceSession(model_path, options)
+                self.tokenizer = tokenizer or self._model_tokenizer()
             except Exception as e:
                 logging.warning(f"Failed to load ONNX model: {e}")
         else:
             logging.warning("onnxruntime not installed. OnnxJailbreakClassifier disabled.")
 
-    def predict(self, text: str) -> Tuple[bool, float]:
+    def _model_tokenizer(self):
+        meta = self.session.get_modelmeta().custom_metadata_map
+        version = meta.get(TOKENIZER_METADATA_KEY, Md5HashTokenizer.version)
+        shape = self.session.get_inputs()[0].shape
+        max_len = int(meta.get(f"{TOKENIZER_METADATA_KEY}.max_len", shape[-1] if isinstance(shape[-1], int) else 64))
+        vocab_size = int(meta.get(f"{TOKENIZER_METADATA_KEY}.vocab_size", 8192))
+        return tokenizer_for(version, vocab_size=vocab_size, max_len=max_len)
+
+    def fingerprint(self) -> str:
+        """
+        Hash of the model file and its external-data sibling (`<model>.data`), if any.
+        """
+        if getattr(self, "_fingerprint", None) is None:
+            digest = hashlib.sha256(type(self).__qualname__.encode("utf-8"))
+            for path in (self.model_path, f"{self.model_path}.data"):
+                if not os.path.exists(path):
+                    continue
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _run(self, input_ids, attention_mask):
+        inputs = self.session.get_inputs()
+        input_feed = {inputs[0].name: input_ids}
+        if len(inputs) > 1:
+            input_feed[inputs[1].name] = attention_mask
+        output = self.session.run(None, input_feed)[0]
+        if output.ndim == 2 and output.shape[1] == 2:
+            # Two-class logits (SAFE, JAILBREAK) -> softmax probability of JAILBREAK
+            shifted = output - output.max(axis=1, keepdims=True)
+            exp = np.exp(shifted)
+            return exp[:, 1] / exp.sum(axis=1)
+        # Otherwise assume output is probability of positive class (jailbreak)
+        return output.reshape(len(input_ids), -1)[:, 0]
+
+    def predict(self, text: Union[str, TextView]) -> Tuple[bool, float]:
         """
         Returns (is_jailbreak, probability)
         """
@@ -35,12 +100,28 @@ class OnnxJailbreakClassifier:
         try:
             tokens = self.tokenizer.tokenize(text)
             # Reshape to (1, max_len)
-            input_feed = {self.session.get_inputs()[0].name: tokens.reshape(1, -1)}
-            output = self.session.run(None, input_feed)[0]
-            probability = float(output[0][0])
-            
-            # Assuming output is probability of positive class (jailbreak)
-            return probability >= 0.5, probability
+            input_ids = tokens.reshape(1, -1)
+            probability = float(self._run(input_ids, (input_ids != 0).astype(np.int64))[0])
+            return probability >= self.threshold, probability
         except Exception as e:
             logging.error(f"Inference failed: {e}")
             return False, 0.0
+
+    def predict_batch(self, texts: Sequence[Union[str, TextView]]) -> Optional["np.ndarray"]:
+        """
+        Returns jailbreak probabilities as a float32 array aligned with `texts`,
+        or None if the model is unavailable.
+        """
+        if not self.session or not self.tokenizer:
+            return None
+
+        probabilities = np.zeros(len(texts), dtype=np.float32)
+        try:
+            for start in range(0, len(texts), self.batch_size):
+                chunk = texts[start:start + self.batch_size]
+                input_ids, attention_mask = self.tokenizer.tokenize_batch(chunk)
+                probabilities[start:start + len(chunk)] = self._run(input_ids, attention_mask)
+        except Exception as e:
+            logging.error(f"Batch inference failed: {e}")
+            return None
+        return probabilities
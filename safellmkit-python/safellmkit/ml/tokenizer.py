@@ -1,29 +1,163 @@
 import hashlib
 import re
+from typing import Dict, List, Sequence, Tuple, Union
 import numpy as np
 
+from ..text import TextView, as_view
+
+# ONNX metadata_props key naming the tokenizer a model was trained with; models
+# without it predate versioning and use md5-v1
+TOKENIZER_METADATA_KEY = "safellmkit.tokenizer"
+
+FNV_OFFSET = 0x811C9DC5
+FNV_PRIME = 0x01000193
+
+
+def fnv1a_32(data: bytes) -> int:
+    """Reference 32-bit FNV-1a; the batched tokenizer path must agree with it."""
+    h = FNV_OFFSET
+    for byte in data:
+        h = ((h ^ byte) * FNV_PRIME) & 0xFFFFFFFF
+    return h
+
+
+def fnv1a_32_batch(items: Sequence[bytes]) -> np.ndarray:
+    """Vectorized fnv1a_32: column-wise over a zero-padded byte matrix, uint32 math wraps."""
+    lengths = np.fromiter((len(b) for b in items), dtype=np.int64, count=len(items))
+    width = int(lengths.max()) if len(items) else 0
+    # Gather every item's bytes from one joined buffer into a padded matrix
+    buffer = np.frombuffer(b"".join(items) + b"\0", dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    cols = np.arange(width)
+    inside = cols[None, :] < lengths[:, None]
+    matrix = np.where(inside, buffer[np.where(inside, starts[:, None] + cols[None, :], len(buffer) - 1)], 0).astype(np.uint32)
+    h = np.full(len(items), FNV_OFFSET, dtype=np.uint32)
+    prime = np.uint32(FNV_PRIME)
+    for col in range(width):
+        active = lengths > col
+        h[active] = (h[active] ^ matrix[active, col]) * prime
+    return h
+
+
 class Md5HashTokenizer:
+    version = "md5-v1"
+
     def __init__(self, vocab_size=8192, max_len=64):
         self.vocab_size = vocab_size
         self.max_len = max_len
 
-    def tokenize(self, text: str) -> np.ndarray:
-        # Preprocessing matching Kotlin/JS logic
-        lower = text.lower()
+    def _words(self, text: Union[str, TextView]):
+        # Preprocessing matching Kotlin/JS logic; kept exactly as v1 models were trained,
+        # so it reads the original text, not TextView.normalized (that is v2 only)
+        lower = str(text).lower()
         cleaned = re.sub(r'[^a-z0-9\s]', '', lower)
-        words = cleaned.split()
-        
+        return cleaned.split()[:self.max_len]
+
+    def _token(self, word: str) -> int:
+        # Stable MD5 hashing
+        h = hashlib.md5(word.encode("utf-8")).hexdigest()
+        # Take first 8 hex chars (32 bits), then modulo
+        return (int(h[:8], 16) % self.vocab_size) + 1
+
+    def tokenize(self, text: Union[str, TextView]) -> np.ndarray:
         tokens = np.zeros(self.max_len, dtype=np.int64)
-        count = min(len(words), self.max_len)
-        
-        for i in range(count):
-            word = words[i]
-            # Stable MD5 hashing
-            h = hashlib.md5(word.encode("utf-8")).hexdigest()
-            # Take first 8 hex chars (32 bits)
-            val = int(h[:8], 16)
-            # Modulo
-            token = (val % self.vocab_size) + 1
-            tokens[i] = token
-            
+        for i, word in enumerate(self._words(text)):
+            tokens[i] = self._token(word)
         return tokens
+
+    def tokenize_batch(self, texts: Sequence[Union[str, TextView]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (input_ids, attention_mask), both shaped (len(texts), max_len).
+        """
+        input_ids = np.zeros((len(texts), self.max_len), dtype=np.int64)
+        for row, text in enumerate(texts):
+            for i, word in enumerate(self._words(text)):
+                input_ids[row, i] = self._token(word)
+        attention_mask = (input_ids != 0).astype(np.int64)
+        return input_ids, attention_mask
+
+
+class FnvHashTokenizer:
+    """
+    Tokenizer v2: FNV-1a word hashing and one normalization shared by training and
+    inference (TextView.normalized, then every non-alphanumeric run becomes a word
+    break). Token ids are cached per word; cache misses in a batch are hashed
+    together with numpy.
+    """
+
+    version = "fnv1a-v2"
+    _SPLIT = re.compile(r"[^a-z0-9]+")
+
+    def __init__(self, vocab_size=8192, max_len=64, cache_size=1 << 16):
+        self.vocab_size = vocab_size
+        self.max_len = max_len
+        self.cache_size = cache_size
+        self._cache: Dict[str, int] = {}
+
+    def words(self, text: Union[str, TextView]) -> List[str]:
+        return self._SPLIT.sub(" ", as_view(text).normalized).split()[:self.max_len]
+
+    def _hash_words(self, words: List[str]) -> np.ndarray:
+        hashes = fnv1a_32_batch([w.encode("utf-8") for w in words])
+        return (hashes % np.uint32(self.vocab_size)).astype(np.int64) + 1
+
+    def _ids(self, rows: List[List[str]]) -> np.ndarray:
+        cache = self._cache
+        unique = {w for words in rows for w in words}
+        lookup = {w: cache[w] for w in unique if w in cache}
+        missing = [w for w in unique if w not in lookup]
+        if missing:
+            lookup.update(zip(missing, self._hash_words(missing).tolist()))
+            if len(cache) + len(missing) > self.cache_size:
+                cache.clear()
+            cache.update((w, lookup[w]) for w in missing)
+        input_ids = np.zeros((len(rows), self.max_len), dtype=np.int64)
+        for row, words in enumerate(rows):
+            if words:
+                input_ids[row, :len(words)] = [lookup[w] for w in words]
+        return input_ids
+
+    def tokenize(self, text: Union[str, TextView]) -> np.ndarray:
+        return self._ids([self.words(text)])[0]
+
+    def tokenize_batch(self, texts: Sequence[Union[str, TextView]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (input_ids, attention_mask), both shaped (len(texts), max_len).
+        """
+        input_ids = self._ids([self.words(text) for text in texts])
+        return input_ids, (input_ids != 0).astype(np.int64)
+
+
+TOKENIZERS = {
+    Md5HashTokenizer.version: Md5HashTokenizer,
+    FnvHashTokenizer.version: FnvHashTokenizer,
+}
+
+
+def tokenizer_for(version: str, vocab_size: int = 8192, max_len: int = 64):
+    try:
+        return TOKENIZERS[version](vocab_size=vocab_size, max_len=max_len)
+    except KeyError:
+        raise ValueError(f"Unknown tokenizer version '{version}'; supported: {', '.join(TOKENIZERS)}")
+
+
+def stamp_tokenizer(model_path: str, tokenizer) -> None:
+    """
+    Records the tokenizer version and shape in an exported model's metadata so
+    OnnxJailbreakClassifier selects it automatically. External data is left in place.
+    """
+    import onnx
+
+    model = onnx.load(model_path, load_external_data=False)
+    values = {
+        TOKENIZER_METADATA_KEY: tokenizer.version,
+        f"{TOKENIZER_METADATA_KEY}.vocab_size": str(tokenizer.vocab_size),
+        f"{TOKENIZER_METADATA_KEY}.max_len": str(tokenizer.max_len),
+    }
+    kept = [p for p in model.metadata_props if p.key not in values]
+    del model.metadata_props[:]
+    model.metadata_props.extend(kept)
+    for key, value in values.items():
+        prop = model.metadata_props.add()
+        prop.key, prop.value = key, value
+    onnx.save(model, model_path)
@@ -0,0 +1,67 @@
+import json
+from typing import Dict, List, Optional, Tuple, Union
+
+from .engine import RULE_MAP, Policy, apply_policy
+from .ml import CascadeClassifier, OnnxJailbreakClassifier
+from .models import GuardrailResult
+from .prefilter import Prefilter
+from .rules import Rule, RuleHit
+from .text import TextView
+
+
+def detector_key(entry: dict) -> str:
+    """Identity of the detector a policy entry needs: rule type plus constructor params."""
+    params = entry.get("params")
+    return f"{entry['rule_type']}:{json.dumps(params, sort_keys=True)}" if params else entry["rule_type"]
+
+
+class MultiPolicyEvaluator:
+    """
+    Verdicts for one input under many policies in a single pass. Each distinct
+    detector (rule type + params) is built once and scanned once per input, the
+    classifier runs once, and every policy's action_mode/min_severity/ml_thresholds
+    logic is applied to the shared output. Each result equals what a
+    GuardrailsEngine for that policy (with the same classifier) would return.
+    """
+
+    def __init__(
+        self,
+        policies: Dict[str, Policy],
+        classifier: Optional[Union[OnnxJailbreakClassifier, CascadeClassifier]] = None,
+        prefilter: bool = False
+    ):
+        self.policies = dict(policies)
+        self.classifier = classifier
+        self.detectors: Dict[str, Rule] = {}
+        # Per policy: rule type -> detector key (first entry wins, as in GuardrailsEngine)
+        self._bindings: Dict[str, Dict[str, str]] = {}
+        for name, policy in self.policies.items():
+            binding: Dict[str, str] = {}
+            for entry in policy.input_rules:
+                r_type = entry["rule_type"]
+                if r_type not in RULE_MAP or r_type in binding:
+                    continue
+                key = detector_key(entry)
+                if key not in self.detectors:
+                    self.detectors[key] = RULE_MAP[r_type](**entry.get("params", {}))
+                binding[r_type] = key
+            self._bindings[name] = binding
+        self.prefilter: Optional[Prefilter] = Prefilter(self.detectors) if prefilter else None
+
+    def evaluate(self, text: str) -> Dict[str, GuardrailResult]:
+        view = TextView(text)
+        candidates = self.prefilter.candidates(view) if self.prefilter else None
+        scanned: Dict[str, List[RuleHit]] = {}
+        for key, rule in self.detectors.items():
+            if candidates is None or key in candidates:
+                scanned[key] = rule.scan(view)
+        ml: Optional[Tuple[bool, float]] = self.classifier.predict(view) if self.classifier else None
+
+        sanitize_cache: Dict = {}
+        results = {}
+        for name, policy in self.policies.items():
+            binding = self._bindings[name]
+            rules = {r_type: self.detectors[key] for r_type, key in binding.items()}
+            hits = {r_type: scanned[key] for r_type, key in binding.items() if key in scanned}
+            results[name] = apply_policy(policy, rules, text, hits, ml, sanitize_cache)
+        return results
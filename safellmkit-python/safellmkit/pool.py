@@ -0,0 +1,131 @@
+import hashlib
+import json
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Mapping, Optional, Tuple, Union
+
+from .engine import RULE_MAP, GuardrailsEngine, Policy
+from .ml import CascadeClassifier, OnnxJailbreakClassifier
+from .models import GuardrailResult
+from .multipolicy import detector_key
+from .prefilter import Prefilter
+from .rules import Rule
+
+
+def policy_key(policy: Policy) -> str:
+    """Identity of a policy's full configuration; equal configs give equal verdicts."""
+    return hashlib.sha256(json.dumps(policy.config, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class EnginePool:
+    """
+    Per-tenant GuardrailsEngines for multi-tenant services. Engines are built on a
+    tenant's first request from `policies` (a mapping or a loader callable) and kept
+    in an LRU of `max_engines` tenants; the least recently used is dropped first.
+
+    Everything expensive is interned across tenants: detectors are keyed by rule
+    type + params (as in MultiPolicyEvaluator), prefilters by the set of detectors
+    they cover, and tenants with identical policy configs share one engine. The
+    classifier is one shared instance. Memory therefore grows with the number of
+    unique configurations, and a tenant whose detectors already exist costs one
+    small engine object to bring up. Detectors stay interned after their tenants
+    are evicted, so a returning tenant never recompiles.
+    """
+
+    def __init__(
+        self,
+        policies: Union[Mapping[str, Policy], Callable[[str], Policy]],
+        classifier: Optional[Union[OnnxJailbreakClassifier, CascadeClassifier]] = None,
+        prefilter: bool = False,
+        max_engines: int = 1024
+    ):
+        self._load = policies.__getitem__ if isinstance(policies, Mapping) else policies
+        self.classifier = classifier
+        self.use_prefilter = prefilter
+        self.max_engines = max_engines
+        self.detectors: Dict[str, Rule] = {}
+        self._prefilters: Dict[Tuple[Tuple[str, str], ...], Prefilter] = {}
+        # Live engines by policy key; an engine goes away with its last tenant
+        self._engines: "weakref.WeakValueDictionary[str, GuardrailsEngine]" = weakref.WeakValueDictionary()
+        self._tenants: "OrderedDict[str, GuardrailsEngine]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _detector(self, entry: dict) -> Rule:
+        key = detector_key(entry)
+        rule = self.detectors.get(key)
+        if rule is None:
+            rule = self.detectors[key] = RULE_MAP[entry["rule_type"]](**entry.get("params", {}))
+        return rule
+
+    def _build(self, policy: Policy) -> GuardrailsEngine:
+        prefilter: Optional[Prefilter] = None
+        if self.use_prefilter:
+            # A prefilter only depends on which detector serves each rule type (first entry wins)
+            entries: Dict[str, dict] = {}
+            for entry in policy.input_rules:
+                if entry["rule_type"] in RULE_MAP:
+                    entries.setdefault(entry["rule_type"], entry)
+            keys = tuple(sorted((r_type, detector_key(entry)) for r_type, entry in entries.items()))
+            prefilter = self._prefilters.get(keys)
+            if prefilter is None:
+                rules = {r_type: self._detector(entry) for r_type, entry in entries.items()}
+                prefilter = self._prefilters[keys] = Prefilter(rules)
+        return GuardrailsEngine(
+            policy,
+            classifier=self.classifier,
+            prefilter=prefilter or False,
+            rule_factory=self._detector
+        )
+
+    def engine(self, tenant: str) -> GuardrailsEngine:
+        """The tenant's engine, building it (or reusing an identical one) on first use."""
+        with self._lock:
+            engine = self._tenants.get(tenant)
+            if engine is not None:
+                self._tenants.move_to_end(tenant)
+                self.hits += 1
+                return engine
+            self.misses += 1
+        # The loader may be slow (file, database, network); never hold the lock across it
+        policy = self._load(tenant)
+        key = policy_key(policy)
+        with self._lock:
+            engine = self._tenants.get(tenant)
+            if engine is not None:
+                # Another thread loaded this tenant meanwhile
+                self._tenants.move_to_end(tenant)
+                return engine
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = self._build(policy)
+                self._engines[key] = engine
+            self._tenants[tenant] = engine
+            if len(self._tenants) > self.max_engines:
+                self._tenants.popitem(last=False)
+                self.evictions += 1
+            return engine
+
+    def validate_input(self, tenant: str, text: str, **kwargs) -> GuardrailResult:
+        """validate_input() with the tenant's engine; kwargs are passed through."""
+        return self.engine(tenant).validate_input(text, **kwargs)
+
+    def evict(self, tenant: str) -> None:
+        """Drops a tenant's engine, e.g. after its policy changed."""
+        with self._lock:
+            self._tenants.pop(tenant, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tenants": len(self._tenants),
+                "engines": len(self._engines),
+                "detectors": len(self.detectors),
+                "prefilters": len(self._prefilters),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
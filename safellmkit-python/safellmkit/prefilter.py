@@ -0,0 +1,75 @@
+import re
+from typing import Dict, List, Optional, Set, Union
+
+from .rules import Rule
+from .text import TextView, as_view, fold, normalize
+
+
+class _RuleProbe:
+    def __init__(self, form: str, literals: List[str], probe: Optional[str]):
+        self.form = form
+        if form == "folded":
+            literals = [fold(literal) for literal in literals]
+        elif form == "normalized":
+            literals = [normalize(literal) for literal in literals]
+        # A literal that contains a shorter literal is implied by it; keep the shorter one
+        unique = sorted(set(literals), key=len)
+        kept: List[str] = []
+        for literal in unique:
+            if not any(k in literal for k in kept):
+                kept.append(literal)
+        self.literals = kept
+        self.probe = re.compile(probe) if probe else None
+
+    def may_match(self, view: TextView) -> bool:
+        text = view.form(self.form)
+        for literal in self.literals:
+            if literal in text:
+                return True
+        return bool(self.probe and self.probe.search(text))
+
+
+class Prefilter:
+    """
+    Necessary-condition filter compiled from the policy's rules. A rule is skipped for
+    a text only when the text provably cannot satisfy that rule's prefilter contract
+    (see Rule.prefilter_literals), so skipping never loses a finding.
+
+    Probes are plain substring searches, which run in C and beat a per-character
+    n-gram scan in CPython by roughly an order of magnitude.
+    """
+
+    def __init__(self, rules: Dict[str, Rule]):
+        self.probes: Dict[str, _RuleProbe] = {}
+        self.always: Set[str] = set()
+        for key, rule in rules.items():
+            literals = rule.prefilter_literals()
+            probe = rule.prefilter_probe()
+            if literals is None and probe is None:
+                self.always.add(key)
+            else:
+                self.probes[key] = _RuleProbe(rule.text_form, literals or [], probe)
+        self.checked = 0
+        self.skipped = 0
+
+    def candidates(self, text: Union[str, TextView]) -> Set[str]:
+        """
+        Returns the keys of rules that may match `text`; an empty set proves that
+        no rule can report a finding.
+        """
+        view = as_view(text)
+        found = set(self.always)
+        for key, probe in self.probes.items():
+            if probe.may_match(view):
+                found.add(key)
+        self.checked += 1
+        if not found:
+            self.skipped += 1
+        return found
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.skipped / self.checked if self.checked else 0.0
+
+    def stats(self) -> dict:
+        return {"checked": self.checked, "skipped": self.skipped, "skip_ratio": self.skip_ratio}
@@ -0,0 +1,245 @@
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columnar import ACTIONS, dedupe_texts, decide, detect, to_text_list
+from .shared import load_arrays, save_arrays
+from .text import TextView
+
+
+class SignalBatch:
+    """
+    Compact raw detector output, one row per text: max severity per rule type
+    (-1 = no hit), classifier probability (NaN = not scored) and match spans as
+    parallel arrays, plus the classifier's own is_jailbreak threshold. Decisions are
+    not stored; replay() derives them under any policy.
+    """
+
+    def __init__(
+        self,
+        rule_types: List[str],
+        severities: np.ndarray,
+        ml_probability: np.ndarray,
+        span_row: Optional[np.ndarray] = None,
+        span_rule: Optional[np.ndarray] = None,
+        span_start: Optional[np.ndarray] = None,
+        span_end: Optional[np.ndarray] = None,
+        classifier_threshold: float = 0.5
+    ):
+        self.rule_types = list(rule_types)
+        self.classifier_threshold = classifier_threshold
+        self.severities = severities
+        self.ml_probability = ml_probability
+        empty = np.zeros(0, dtype=np.int64)
+        self.span_row = empty if span_row is None else span_row
+        self.span_rule = np.zeros(0, dtype=np.int16) if span_rule is None else span_rule
+        self.span_start = empty if span_start is None else span_start
+        self.span_end = empty if span_end is None else span_end
+
+    def __len__(self) -> int:
+        return len(self.severities)
+
+    def save(self, path: str) -> None:
+        save_arrays(path, {
+            "severities": self.severities,
+            "ml_probability": self.ml_probability,
+            "span_row": self.span_row,
+            "span_rule": self.span_rule,
+            "span_start": self.span_start,
+            "span_end": self.span_end,
+        }, meta={"rule_types": self.rule_types, "classifier_threshold": self.classifier_threshold})
+
+    @classmethod
+    def load(cls, path: str) -> "SignalBatch":
+        """Memory-maps a saved batch; nothing is read until it is used."""
+        arrays, meta = load_arrays(path)
+        return cls(meta["rule_types"], **arrays, classifier_threshold=meta.get("classifier_threshold", 0.5))
+
+    @classmethod
+    def concat(cls, batches: Sequence["SignalBatch"]) -> "SignalBatch":
+        thresholds = {batch.classifier_threshold for batch in batches}
+        if len(thresholds) > 1:
+            raise ValueError(f"Batches were recorded with different classifier thresholds: {sorted(thresholds)}")
+        rule_types: List[str] = []
+        for batch in batches:
+            rule_types.extend(r for r in batch.rule_types if r not in rule_types)
+        severities, probabilities = [], []
+        rows, rules, starts, ends = [], [], [], []
+        offset = 0
+        for batch in batches:
+            aligned = np.full((len(batch), len(rule_types)), -1, dtype=np.int16)
+            remap = np.asarray([rule_types.index(r) for r in batch.rule_types], dtype=np.int16)
+            if len(remap):
+                aligned[:, remap] = batch.severities
+            severities.append(aligned)
+            probabilities.append(np.asarray(batch.ml_probability, dtype=np.float32))
+            rows.append(batch.span_row + offset)
+            rules.append(remap[batch.span_rule] if len(remap) else batch.span_rule)
+            starts.append(batch.span_start)
+            ends.append(batch.span_end)
+            offset += len(batch)
+        return cls(
+            rule_types,
+            np.concatenate(severities) if severities else np.zeros((0, len(rule_types)), np.int16),
+            np.concatenate(probabilities) if probabilities else np.zeros(0, np.float32),
+            np.concatenate(rows).astype(np.int64) if rows else None,
+            np.concatenate(rules).astype(np.int16) if rules else None,
+            np.concatenate(starts).astype(np.int64) if starts else None,
+            np.concatenate(ends).astype(np.int64) if ends else None,
+            thresholds.pop() if thresholds else 0.5
+        )
+
+
+class SignalRecorder:
+    """
+    Accumulates signal rows from GuardrailsEngine.validate_input (thread-safe).
+    Call drain() periodically and save the returned batch.
+    """
+
+    def __init__(self, rule_types: List[str], classifier_threshold: float = 0.5):
+        self.rule_types = list(rule_types)
+        self.classifier_threshold = classifier_threshold
+        self._columns = {r_type: col for col, r_type in enumerate(self.rule_types)}
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._severities: List[List[int]] = []
+        self._probabilities: List[float] = []
+        self._spans: List[Tuple[int, int, int, int]] = []
+
+    def record(
+        self,
+        severities: Dict[str, int],
+        probability: Optional[float],
+        spans: Sequence[Tuple[str, int, int]] = ()
+    ) -> None:
+        row = [-1] * len(self.rule_types)
+        for r_type, severity in severities.items():
+            row[self._columns[r_type]] = severity
+        with self._lock:
+            index = len(self._severities)
+            self._severities.append(row)
+            self._probabilities.append(np.nan if probability is None else probability)
+            for r_type, start, end in spans:
+                self._spans.append((index, self._columns[r_type], start, end))
+
+    def __len__(self) -> int:
+        return len(self._severities)
+
+    def drain(self) -> SignalBatch:
+        """Returns everything recorded so far and starts a new batch."""
+        with self._lock:
+            severities, probabilities, spans = self._severities, self._probabilities, self._spans
+            self._reset()
+        span_columns = np.asarray(spans, dtype=np.int64).reshape(-1, 4)
+        return SignalBatch(
+            self.rule_types,
+            np.asarray(severities, dtype=np.int16).reshape(-1, len(self.rule_types)),
+            np.asarray(probabilities, dtype=np.float32),
+            span_columns[:, 0],
+            span_columns[:, 1].astype(np.int16),
+            span_columns[:, 2],
+            span_columns[:, 3],
+            self.classifier_threshold
+        )
+
+
+def collect_signals(engine, values) -> SignalBatch:
+    """
+    Runs the engine's detectors (no decisions) over a column of texts; null rows
+    get no hits and no probability.
+    """
+    texts = to_text_list(values)
+    unique, inverse = dedupe_texts(texts)
+    views = [TextView(t) for t in unique]
+    candidates = [engine.prefilter.candidates(v) for v in views] if engine.prefilter else None
+    detection = detect(engine, views, candidates)
+
+    valid = inverse >= 0
+    gather = np.where(valid, inverse, 0)
+    severities = np.full((len(texts), len(detection.rule_types)), -1, dtype=np.int16)
+    probabilities = np.full(len(texts), np.nan, dtype=np.float32)
+    if unique:
+        severities[valid] = detection.severities[gather[valid]]
+        if detection.probabilities is not None:
+            probabilities[valid] = detection.probabilities[gather[valid]]
+
+    # Spans: repeat each distinct text's spans for every row holding that text
+    hit_row = np.asarray(detection.hit_row, dtype=np.int64)
+    has_span = np.asarray(detection.hit_start, dtype=np.int64) >= 0
+    rows = np.flatnonzero(valid)
+    order = np.argsort(inverse[rows], kind="stable")
+    rows, sources = rows[order], inverse[rows][order]
+    span_idx = np.flatnonzero(has_span)
+    span_src = hit_row[span_idx]
+    # For each span, the range of rows sharing its source text
+    lo = np.searchsorted(sources, span_src, side="left")
+    hi = np.searchsorted(sources, span_src, side="right")
+    lengths = hi - lo
+    total = int(lengths.sum())
+    pick = np.repeat(span_idx, lengths)
+    within = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    span_rows = rows[np.repeat(lo, lengths) + within] if total else np.zeros(0, dtype=np.int64)
+    return SignalBatch(
+        detection.rule_types,
+        severities,
+        probabilities,
+        span_rows,
+        np.asarray(detection.hit_rule, dtype=np.int16)[pick],
+        np.asarray(detection.hit_start, dtype=np.int64)[pick],
+        np.asarray(detection.hit_end, dtype=np.int64)[pick],
+        getattr(engine.classifier, "threshold", 0.5)
+    )
+
+
+class ReplayResult:
+    def __init__(self, action_codes: np.ndarray, risk_scores: np.ndarray):
+        self.action_codes = action_codes
+        self.risk_scores = risk_scores
+
+    def __len__(self) -> int:
+        return len(self.action_codes)
+
+    @property
+    def actions(self) -> np.ndarray:
+        return np.asarray([a.value for a in ACTIONS], dtype=object)[self.action_codes]
+
+    def action_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.action_codes, minlength=len(ACTIONS))
+        return {action.value: int(count) for action, count in zip(ACTIONS, counts)}
+
+
+def replay(signals: SignalBatch, policy, chunk_size: int = 1 << 22) -> ReplayResult:
+    """
+    Recomputes actions and risk scores for recorded signals under `policy`
+    without re-running any detector. Rows are processed in chunks so memory-mapped
+    batches of any size stream through.
+    """
+    from .engine import RULE_MAP
+
+    missing = [
+        e["rule_type"] for e in policy.input_rules
+        if e["rule_type"] in RULE_MAP and e["rule_type"] not in signals.rule_types
+    ]
+    if missing:
+        raise ValueError(f"Signals were not recorded for rule types: {', '.join(sorted(set(missing)))}")
+
+    n = len(signals)
+    action_codes = np.zeros(n, dtype=np.int8)
+    risk_scores = np.zeros(n, dtype=np.uint8)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        # NaN probabilities (classifier not run) are ignored by decide()
+        codes, risk = decide(
+            policy.input_rules,
+            signals.rule_types,
+            signals.severities[start:stop],
+            signals.ml_probability[start:stop],
+            policy.ml_thresholds,
+            signals.classifier_threshold
+        )
+        action_codes[start:stop] = codes
+        risk_scores[start:stop] = risk
+    return ReplayResult(action_codes, risk_scores)
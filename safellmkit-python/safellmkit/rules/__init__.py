@@ -1,13 +1,16 @@
-from .base import Rule
+from .base import Rule, RuleHit
 from .prompt_injection import PromptInjectionRule
 from .pii import PiiRule
 from .toxicity import ToxicityRule
 from .signal_jailbreak import SignalJailbreakRule
+from .known_attack import KnownAttackRule
 
 __all__ = [
     "Rule",
+    "RuleHit",
     "PromptInjectionRule",
     "PiiRule", 
     "ToxicityRule",
-    "SignalJailbreakRule"
+    "SignalJailbreakRule",
+    "KnownAttackRule"
 ]
@@ -1,14 +1,108 @@
-from abc import ABC, abstractmethod
-from typing import List
+import hashlib
+import json
+from abc import ABC
+from typing import List, NamedTuple, Optional, Tuple, Union
 from ..models import GuardrailFinding
+from ..text import TextView
+
+class RuleHit(NamedTuple):
+    """Lightweight detection record; one per finding, without the pydantic cost."""
+    severity: int
+    message: str
+    start: int = -1
+    end: int = -1
+
+def first_hit_per_message(hits: List[RuleHit]) -> List[RuleHit]:
+    """Earliest hit for each message; merges windows for rules that report first occurrences."""
+    first = {}
+    for hit in hits:
+        if hit.message not in first or hit.start < first[hit.message].start:
+            first[hit.message] = hit
+    return list(first.values())
 
 class Rule(ABC):
     name: str = "GenericRule"
     category: str = "General"
+    # TextView form that scan() reads: "text" (original), "normalized" or "folded"
+    text_form: str = "folded"
+
+    # Subclasses implement scan() (preferred) or, as before, check()
 
-    @abstractmethod
-    def check(self, input_text: str) -> List[GuardrailFinding]:
-        pass
+    def scan(self, input_text: Union[str, TextView]) -> List[RuleHit]:
+        """
+        Accepts a raw string or the engine's shared TextView; hit spans are
+        reported in original-text offsets. The default adapts check() findings,
+        without spans, for rules written against the older check()-only API.
+        """
+        if type(self).check is Rule.check:
+            raise NotImplementedError(f"{type(self).__name__} must implement scan() or check()")
+        return [RuleHit(f.severity, f.message) for f in self.check(str(input_text))]
+
+    def check(self, input_text: Union[str, TextView]) -> List[GuardrailFinding]:
+        if type(self).scan is Rule.scan:
+            raise NotImplementedError(f"{type(self).__name__} must implement scan() or check()")
+        return [
+            GuardrailFinding(
+                category=self.category,
+                rule=self.name,
+                severity=hit.severity,
+                message=hit.message
+            )
+            for hit in self.scan(input_text)
+        ]
 
     def sanitize(self, input_text: str) -> str:
         return input_text
+
+    def pseudonymize(self, input_text: str, vault) -> str:
+        """
+        Like sanitize(), but replaces values with reversible placeholders from a
+        PseudonymVault; rules without reversible values just sanitize.
+        """
+        return self.sanitize(input_text)
+
+    # Prefilter contract: scan() can only report hits (and sanitize() can only change
+    # the text) when the rule's text_form of the input contains one of
+    # prefilter_literals() or matches prefilter_probe(). Literals for the "folded"
+    # form are folded by the prefilter. Returning None from both means "always run".
+    def prefilter_literals(self) -> Optional[List[str]]:
+        return None
+
+    def prefilter_probe(self) -> Optional[str]:
+        return None
+
+    # Chunked document validation (see documents.validate_buffer): windows are cut at
+    # whitespace and overlap by at least the longest max_match_length() of the policy's
+    # rules, counted in non-whitespace characters. Matches without whitespace therefore
+    # never straddle a cut and need not be counted.
+    def max_match_length(self) -> Optional[int]:
+        """Longest match in non-whitespace characters; None if hits depend on the whole text."""
+        return None
+
+    def merge_window_hits(self, hits: List[RuleHit]) -> List[RuleHit]:
+        """
+        Combines hits from overlapping windows (spans already in document offsets);
+        by default drops the copies found twice in an overlap.
+        """
+        return list(dict.fromkeys(hits))
+
+    def sanitize_spans(self, input_text: str) -> List[Tuple[int, int]]:
+        """Spans of `input_text` that sanitize() rewrites; streamed output is never cut inside one."""
+        return []
+
+    def fingerprint(self) -> str:
+        """
+        Stable hash of the rule's identity and its UPPER_CASE detection tables, so
+        cached verdicts are invalidated when patterns or word lists change.
+        """
+        constants = {}
+        for cls in type(self).__mro__:
+            for key, value in vars(cls).items():
+                if key.isupper() and key not in constants:
+                    constants[key] = value
+        payload = json.dumps(
+            [type(self).__module__, type(self).__qualname__, self.name, constants],
+            sort_keys=True,
+            default=lambda v: sorted(v) if isinstance(v, (set, frozenset)) else repr(v)
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
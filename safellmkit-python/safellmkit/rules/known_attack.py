@@ -0,0 +1,38 @@
+import logging
+from typing import List, Optional, Union
+from ..minhash import KnownAttackIndex
+from ..text import TextView
+from .base import Rule, RuleHit
+
+class KnownAttackRule(Rule):
+    name = "KNOWN_ATTACK"
+    category = "SECURITY"
+
+    SEVERITY = 9
+
+    def __init__(self, index: Optional[Union[str, KnownAttackIndex]] = None, threshold: float = 0.5):
+        """
+        index: a KnownAttackIndex or the path of one saved by `safellmkit attacks`
+        (policy: "params": {"index": "attacks.slka"}). threshold: minimum estimated
+        Jaccard similarity of word shingles to report a match.
+        """
+        if isinstance(index, str):
+            index = KnownAttackIndex.load(index)
+        if index is None:
+            logging.warning("KnownAttackRule has no index configured; it will not report findings.")
+        self.index = index
+        self.threshold = threshold
+
+    def fingerprint(self) -> str:
+        parts = [super().fingerprint(), repr(self.threshold)]
+        if self.index is not None:
+            parts.append(self.index.fingerprint())
+        return ":".join(parts)
+
+    def scan(self, input_text: Union[str, TextView]) -> List[RuleHit]:
+        if self.index is None:
+            return []
+        return [
+            RuleHit(self.SEVERITY, f"Near-duplicate of known attack '{m.label}' (similarity {m.similarity:.2f})")
+            for m in self.index.query(input_text, threshold=self.threshold, limit=1)
+        ]
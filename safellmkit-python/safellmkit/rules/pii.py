@@ -1,32 +1,51 @@
 import re
-from typing import List
-from ..models import GuardrailFinding
-from .base import Rule
+from typing import List, Optional, Tuple, Union
+from ..text import TextView
+from .base import Rule, RuleHit, first_hit_per_message
 
 class PiiRule(Rule):
     name = "PII_SANITIZER"
     category = "PRIVACY"
+    # Email/phone patterns need the raw characters ('@', digits) that folding rewrites
+    text_form = "text"
 
     EMAIL_REGEX = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
     PHONE_REGEX = r"\b(\+?\d{1,3}[- ]?)?\d{3}[- ]?\d{3}[- ]?\d{4}\b"
 
-    def check(self, input_text: str) -> List[GuardrailFinding]:
-        findings = []
-        if re.search(self.EMAIL_REGEX, input_text):
-            findings.append(GuardrailFinding(
-                category=self.category,
-                rule=self.name,
-                severity=7,
-                message="Email address detected"
-            ))
-        if re.search(self.PHONE_REGEX, input_text):
-            findings.append(GuardrailFinding(
-                category=self.category,
-                rule=self.name,
-                severity=7,
-                message="Phone number detected"
-            ))
-        return findings
+    def prefilter_literals(self) -> Optional[List[str]]:
+        # Every email contains '@'
+        return ["@"]
+
+    def prefilter_probe(self) -> Optional[str]:
+        # Every phone number contains a digit
+        return r"\d"
+
+    def max_match_length(self) -> Optional[int]:
+        # Emails contain no whitespace; the longest phone match is "+123 456 789 0123"
+        return 17
+
+    def merge_window_hits(self, hits: List[RuleHit]) -> List[RuleHit]:
+        # scan() reports the first email and the first phone number
+        return first_hit_per_message(hits)
+
+    def sanitize_spans(self, input_text: str) -> List[Tuple[int, int]]:
+        return [m.span() for regex in (self.EMAIL_REGEX, self.PHONE_REGEX) for m in re.finditer(regex, input_text)]
+
+    def scan(self, input_text: Union[str, TextView]) -> List[RuleHit]:
+        hits = []
+        input_text = str(input_text)
+        m = re.search(self.EMAIL_REGEX, input_text)
+        if m:
+            hits.append(RuleHit(7, "Email address detected", m.start(), m.end()))
+        m = re.search(self.PHONE_REGEX, input_text)
+        if m:
+            hits.append(RuleHit(7, "Phone number detected", m.start(), m.end()))
+        return hits
+
+    def pseudonymize(self, input_text: str, vault) -> str:
+        # Same passes as sanitize(), but each distinct value keeps its own placeholder
+        pseudonymized = re.sub(self.EMAIL_REGEX, lambda m: vault.placeholder("EMAIL", m.group()), input_text)
+        return re.sub(self.PHONE_REGEX, lambda m: vault.placeholder("PHONE", m.group()), pseudonymized)
 
     def sanitize(self, input_text: str) -> str:
         sanitized = re.sub(self.EMAIL_REGEX, "[EMAIL_REDACTED]", input_text)
@@ -1,7 +1,8 @@
 import re
-from typing import List
-from ..models import GuardrailFinding
-from .base import Rule
+from typing import List, Optional, Union
+from ..fuzzy import FuzzyPhraseMatcher
+from ..text import TextView, as_view, fold
+from .base import Rule, RuleHit, first_hit_per_message
 
 class PromptInjectionRule(Rule):
     name = "PROMPT_INJECTION"
@@ -19,15 +20,70 @@ class PromptInjectionRule(Rule):
         r"mode: enabled"
     ]
 
-    def check(self, input_text: str) -> List[GuardrailFinding]:
-        findings = []
-        lower_text = input_text.lower()
-        for pattern in self.PATTERNS:
-            if re.search(pattern, lower_text):
-                findings.append(GuardrailFinding(
-                    category=self.category,
-                    rule=self.name,
-                    severity=10,
-                    message=f"Prompt injection pattern detected: '{pattern}'"
+    REGEX_SYNTAX = set(".^$*+?{}[]\\|()")
+
+    def __init__(self, max_edits: int = 0, min_length: int = 12, chars_per_edit: int = 6):
+        """
+        max_edits: also match plain phrases approximately, within this many edits
+        (insertions, deletions, substitutions) after collapsing whitespace runs.
+        0 keeps exact matching. Phrases shorter than `min_length` stay exact; longer
+        ones get one edit per `chars_per_edit` characters, up to max_edits
+        (chars_per_edit 0: always max_edits). All three are policy "params".
+        """
+        self.max_edits = max_edits
+        self.fuzzy_params = (max_edits, min_length, chars_per_edit)
+        # Plain phrases go through the same folding as the text; real regexes are kept as-is
+        self._compiled = [
+            (pattern, re.compile(pattern if self.REGEX_SYNTAX & set(pattern) else fold(pattern)))
+            for pattern in self.PATTERNS
+        ]
+        plain = [p for p in self.PATTERNS if not self.REGEX_SYNTAX & set(p)]
+        self._fuzzy = (
+            FuzzyPhraseMatcher([fold(p) for p in plain], max_edits, min_length, chars_per_edit)
+            if max_edits > 0 and plain else None
+        )
+        self._fuzzy_index = {p: i for i, p in enumerate(plain)}
+
+    def fingerprint(self) -> str:
+        if not self.max_edits:
+            return super().fingerprint()
+        return f"{super().fingerprint()}:{':'.join(map(str, self.fuzzy_params))}"
+
+    def prefilter_literals(self) -> Optional[List[str]]:
+        # Anything using regex syntax disables the prefilter
+        if any(self.REGEX_SYNTAX & set(p) for p in self.PATTERNS):
+            return None
+        # Approximate matches contain a fragment of one of their phrase's pigeonhole pieces
+        return list(self._fuzzy.literals) if self._fuzzy else list(self.PATTERNS)
+
+    def max_match_length(self) -> Optional[int]:
+        if any(self.REGEX_SYNTAX & set(p) for p in self.PATTERNS):
+            return None
+        if self._fuzzy:
+            return max(len(p) + k for p, k in zip(self._fuzzy.phrases, self._fuzzy.edits))
+        return max(len(fold(p)) for p in self.PATTERNS)
+
+    def merge_window_hits(self, hits: List[RuleHit]) -> List[RuleHit]:
+        # scan() reports each pattern's first occurrence
+        return first_hit_per_message(hits)
+
+    def scan(self, input_text: Union[str, TextView]) -> List[RuleHit]:
+        hits = []
+        view = as_view(input_text)
+        fuzzy = self._fuzzy.first_matches(view.folded) if self._fuzzy else None
+        for pattern, compiled in self._compiled:
+            if fuzzy is not None and pattern in self._fuzzy_index:
+                match = fuzzy.get(self._fuzzy_index[pattern])
+                span = (match.start, match.end) if match else None
+            else:
+                m = compiled.search(view.folded)
+                span = m.span() if m else None
+            if span:
+                start, end = view.to_original(*span)
+                hits.append(RuleHit(
+                    10,
+                    f"Prompt injection pattern detected: '{pattern}'",
+                    start,
+                    end
                 ))
-        return findings
+        return hits
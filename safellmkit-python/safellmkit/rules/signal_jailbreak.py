@@ -1,6 +1,7 @@
-from typing import List
-from ..models import GuardrailFinding
-from .base import Rule
+from typing import List, Optional, Union
+from ..fuzzy import FuzzyPhraseMatcher
+from ..text import TextView, as_view, fold
+from .base import Rule, RuleHit
 
 class SignalJailbreakRule(Rule):
     name = "SIGNAL_JAILBREAK"
@@ -18,22 +19,56 @@ class SignalJailbreakRule(Rule):
         "act as": 3
     }
 
-    def check(self, input_text: str) -> List[GuardrailFinding]:
-        score = 0
+    MESSAGE_PREFIX = "Jailbreak signals detected: "
+
+    def __init__(self, max_edits: int = 0, min_length: int = 12, chars_per_edit: int = 6):
+        """max_edits, min_length, chars_per_edit: approximate signal matching (see PromptInjectionRule)."""
+        self.max_edits = max_edits
+        self.fuzzy_params = (max_edits, min_length, chars_per_edit)
+        self._folded = [(phrase, fold(phrase), weight) for phrase, weight in self.SIGNALS.items()]
+        self._fuzzy = (
+            FuzzyPhraseMatcher([f for _, f, _ in self._folded], max_edits, min_length, chars_per_edit)
+            if max_edits > 0 else None
+        )
+
+    def fingerprint(self) -> str:
+        if not self.max_edits:
+            return super().fingerprint()
+        return f"{super().fingerprint()}:{':'.join(map(str, self.fuzzy_params))}"
+
+    def prefilter_literals(self) -> Optional[List[str]]:
+        return list(self._fuzzy.literals) if self._fuzzy else list(self.SIGNALS)
+
+    def max_match_length(self) -> Optional[int]:
+        if self._fuzzy:
+            return max(len(p) + k for p, k in zip(self._fuzzy.phrases, self._fuzzy.edits))
+        return max(len(f) for _, f, _ in self._folded)
+
+    def merge_window_hits(self, hits: List[RuleHit]) -> List[RuleHit]:
+        # Union of the signals seen in any window, scored once as for the whole text
+        seen = set()
+        for hit in hits:
+            listed = hit.message[len(self.MESSAGE_PREFIX):hit.message.rindex(" (Score: ")]
+            seen.update(listed.split(", "))
+        return self._score([phrase for phrase in self.SIGNALS if phrase in seen])
+
+    def scan(self, input_text: Union[str, TextView]) -> List[RuleHit]:
         detected = []
-        lower = input_text.lower()
+        folded = as_view(input_text).folded
+        fuzzy = self._fuzzy.first_matches(folded) if self._fuzzy else None
         
-        for phrase, weight in self.SIGNALS.items():
-            if phrase.lower() in lower:
-                score += weight
+        for i, (phrase, folded_phrase, weight) in enumerate(self._folded):
+            found = i in fuzzy if fuzzy is not None else folded_phrase in folded
+            if found:
                 detected.append(phrase)
-        
+        return self._score(detected)
+
+    def _score(self, detected: List[str]) -> List[RuleHit]:
+        score = sum(self.SIGNALS[phrase] for phrase in detected)
         if score > 0:
             severity = 10 if score >= 10 else 5
-            return [GuardrailFinding(
-                category=self.category,
-                rule=self.name,
-                severity=severity,
-                message=f"Jailbreak signals detected: {', '.join(detected)} (Score: {score})"
+            return [RuleHit(
+                severity,
+                f"{self.MESSAGE_PREFIX}{', '.join(detected)} (Score: {score})"
             )]
         return []
@@ -1,6 +1,8 @@
-from typing import List
-from ..models import GuardrailFinding
-from .base import Rule
+import re
+from typing import List, Optional, Tuple, Union
+from ..lexicon import Lexicon
+from ..text import TextView, as_view
+from .base import Rule, RuleHit, first_hit_per_message
 
 class ToxicityRule(Rule):
     name = "TOXICITY"
@@ -9,25 +11,51 @@ class ToxicityRule(Rule):
     # Minimal list for demonstration
     BAD_WORDS = ["idiot", "stupid", "dumb", "hate", "kill"]
 
-    def check(self, input_text: str) -> List[GuardrailFinding]:
-        findings = []
-        lower = input_text.lower()
-        for word in self.BAD_WORDS:
-            if word in lower.split(): # simple tokenization check
-                findings.append(GuardrailFinding(
-                    category=self.category,
-                    rule=self.name,
-                    severity=5,
-                    message=f"Toxic language detected: {word}"
-                ))
-        return findings
+    def __init__(self, lexicon: Optional[Union[str, Lexicon]] = None):
+        """
+        lexicon: a Lexicon, or a path to a saved lexicon or term list, replacing
+        BAD_WORDS (policy: "params": {"lexicon": "terms.slka"}).
+        """
+        self.custom_lexicon = lexicon is not None
+        if isinstance(lexicon, str):
+            lexicon = Lexicon.open(lexicon)
+        self.lexicon = lexicon or Lexicon.build((w, 5, self.category) for w in self.BAD_WORDS)
+
+    def prefilter_literals(self) -> Optional[List[str]]:
+        # Large custom lists are not worth probing term by term
+        return None if self.custom_lexicon else list(self.BAD_WORDS)
+
+    def fingerprint(self) -> str:
+        return f"{super().fingerprint()}:{self.lexicon.fingerprint()}" if self.custom_lexicon else super().fingerprint()
+
+    def max_match_length(self) -> Optional[int]:
+        return self.lexicon.max_term_length
+
+    def merge_window_hits(self, hits: List[RuleHit]) -> List[RuleHit]:
+        # scan() reports each term's first occurrence
+        return first_hit_per_message(hits)
+
+    def sanitize_spans(self, input_text: str) -> List[Tuple[int, int]]:
+        return [(hit.start, hit.end) for hit in self._occurrences(input_text)]
+
+    def _occurrences(self, input_text: Union[str, TextView]) -> List[RuleHit]:
+        view = as_view(input_text)
+        hits = []
+        for match in self.lexicon.lookup(view):
+            label = match.term if match.category == self.category else f"{match.term} ({match.category})"
+            start, end = view.to_original(match.start, match.end)
+            hits.append(RuleHit(match.severity, f"Toxic language detected: {label}", start, end))
+        return hits
+
+    def scan(self, input_text: Union[str, TextView]) -> List[RuleHit]:
+        # One finding per distinct term, at its first occurrence
+        return first_hit_per_message(self._occurrences(input_text))
 
     def sanitize(self, input_text: str) -> str:
-        words = input_text.split()
-        sanitized = []
-        for w in words:
-            if w.lower() in self.BAD_WORDS:
-                sanitized.append("*" * len(w))
-            else:
-                sanitized.append(w)
-        return " ".join(sanitized)
+        # Mask every occurrence in place so whitespace and line breaks are preserved
+        chars = list(input_text)
+        for hit in self._occurrences(input_text):
+            for i in range(hit.start, hit.end):
+                if not chars[i].isspace():
+                    chars[i] = "*"
+        return "".join(chars)
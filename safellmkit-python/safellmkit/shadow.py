@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, List, Optional
+
+from pydantic import BaseModel
+
+from .models import GuardrailAction, GuardrailFinding, GuardrailResult
+
+
+class ShadowDisagreement(BaseModel):
+    text_hash: str
+    enforced_action: GuardrailAction
+    shadow_action: GuardrailAction
+    enforced_risk_score: int
+    shadow_risk_score: int
+    shadow_findings: List[GuardrailFinding] = []
+    text: Optional[str] = None
+
+
+class LoggingSink:
+    """Default sink: one warning per disagreement."""
+
+    def __call__(self, disagreement: ShadowDisagreement) -> None:
+        logging.warning(
+            f"Shadow disagreement {disagreement.text_hash[:12]}: enforced "
+            f"{disagreement.enforced_action.value}, shadow {disagreement.shadow_action.value}"
+        )
+
+
+class MemorySink:
+    """Keeps the most recent `maxlen` disagreements in memory."""
+
+    def __init__(self, maxlen: int = 1000):
+        self.items: Deque[ShadowDisagreement] = deque(maxlen=maxlen)
+
+    def __call__(self, disagreement: ShadowDisagreement) -> None:
+        self.items.append(disagreement)
+
+
+class ShadowEvaluator:
+    """
+    Runs a candidate engine (e.g. one with the classifier or new rules) on a sample
+    of enforced traffic in the background and reports verdicts that differ from the
+    enforced ones. Callers never wait on it: at most `max_pending` evaluations are
+    queued or running, and samples beyond that are shed.
+    """
+
+    def __init__(
+        self,
+        candidate,
+        sample_rate: float = 0.1,
+        max_workers: int = 1,
+        max_pending: int = 64,
+        sink: Optional[Callable[[ShadowDisagreement], None]] = None,
+        include_text: bool = False,
+        seed: Optional[int] = None
+    ):
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self.sink = sink or LoggingSink()
+        self.include_text = include_text
+        self._random = random.Random(seed)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="safellmkit-shadow")
+        self._lock = threading.Lock()
+        self.sampled = 0
+        self.shed = 0
+        self.evaluated = 0
+        self.disagreements = 0
+        self.errors = 0
+
+    def submit(self, text: str, enforced: GuardrailResult) -> bool:
+        """Schedules a shadow evaluation if sampled and capacity allows; never blocks."""
+        if self.sample_rate <= 0 or self._random.random() >= self.sample_rate:
+            return False
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.shed += 1
+            return False
+        with self._lock:
+            self.sampled += 1
+        try:
+            self._executor.submit(self._evaluate, text, enforced)
+        except RuntimeError:
+            # Evaluator already closed
+            self._slots.release()
+            return False
+        return True
+
+    def _evaluate(self, text: str, enforced: GuardrailResult) -> None:
+        try:
+            shadow = self.candidate.validate_input(text)
+            with self._lock:
+                self.evaluated += 1
+            if shadow.action != enforced.action:
+                with self._lock:
+                    self.disagreements += 1
+                self.sink(ShadowDisagreement(
+                    text_hash=hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest(),
+                    enforced_action=enforced.action,
+                    shadow_action=shadow.action,
+                    enforced_risk_score=enforced.risk_score,
+                    shadow_risk_score=shadow.risk_score,
+                    shadow_findings=shadow.findings,
+                    text=text if self.include_text else None
+                ))
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logging.warning(f"Shadow evaluation failed: {e}")
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sampled": self.sampled,
+                "shed": self.shed,
+                "evaluated": self.evaluated,
+                "disagreements": self.disagreements,
+                "errors": self.errors,
+                "disagreement_rate": self.disagreements / self.evaluated if self.evaluated else 0.0,
+            }
+
+    def close(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
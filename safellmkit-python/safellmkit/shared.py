@@ -0,0 +1,72 @@
+import json
+import os
+import struct
+from typing import Dict, Optional
+
+import numpy as np
+
+# Single-file container for named numpy arrays that worker processes map read-only.
+# Layout: MAGIC | u32 header length | JSON header | padding | 64-byte aligned array data.
+# Pages come from the OS page cache, so N workers mapping the same file share one copy.
+MAGIC = b"SLKA0001"
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_arrays(path: str, arrays: Dict[str, np.ndarray], meta: Optional[Dict] = None) -> None:
+    """
+    Writes `arrays` (plus optional JSON-serializable `meta`) to `path` atomically.
+    """
+    entries = {}
+    offset = 0
+    contiguous = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype == object:
+            raise ValueError(f"Array '{name}' has object dtype and cannot be memory-mapped")
+        offset = _align(offset)
+        entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        contiguous[name] = array
+        offset += array.nbytes
+
+    header = json.dumps({"arrays": entries, "meta": meta or {}}).encode("utf-8")
+    data_start = _align(len(MAGIC) + 4 + len(header))
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for name, array in contiguous.items():
+            f.write(b"\0" * (data_start + entries[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_arrays(path: str):
+    """
+    Maps a file written by save_arrays. Returns (arrays, meta); every array is a
+    read-only view over one shared mapping, so loading costs no copies.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a SafeLLMKit array file")
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    data_start = _align(len(MAGIC) + 4 + header_len)
+
+    if os.path.getsize(path) > data_start:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.zeros(0, dtype=np.uint8)
+    arrays = {}
+    for name, entry in header["arrays"].items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        start = data_start + entry["offset"]
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+    return arrays, header["meta"]
@@ -0,0 +1,163 @@
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .models import GuardrailResult
+
+
+class VerdictStore:
+    """
+    On-disk verdict cache for bulk validation, backed by SQLite.
+
+    Verdicts are keyed by (content hash, engine fingerprint), so a rules, policy
+    or model update invalidates them automatically while unchanged records of an
+    unchanged setup are never validated twice. Scan checkpoints live in the same
+    database and are committed together with the verdicts they cover.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            " content_hash BLOB NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " PRIMARY KEY (fingerprint, content_hash)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " scan_id TEXT PRIMARY KEY,"
+            " fingerprint TEXT NOT NULL,"
+            " position INTEGER NOT NULL"
+            ")"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def content_hash(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def get_many(self, fingerprint: str, hashes: List[bytes]) -> Dict[bytes, GuardrailResult]:
+        found: Dict[bytes, GuardrailResult] = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = self._conn.execute(
+                "SELECT content_hash, result FROM verdicts WHERE fingerprint = ? AND content_hash IN "
+                f"({','.join('?' * len(chunk))})",
+                [fingerprint, *chunk]
+            )
+            for content_hash, result in rows:
+                found[content_hash] = GuardrailResult.model_validate_json(result)
+        return found
+
+    def put_many(self, fingerprint: str, items: Iterable[Tuple[bytes, GuardrailResult]]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO verdicts (content_hash, fingerprint, result) VALUES (?, ?, ?)",
+            [(content_hash, fingerprint, result.model_dump_json()) for content_hash, result in items]
+        )
+        self._conn.commit()
+
+    def checkpoint(self, scan_id: str, fingerprint: str) -> int:
+        """
+        Returns the number of records already completed by `scan_id`; a checkpoint
+        taken under a different fingerprint does not count.
+        """
+        row = self._conn.execute(
+            "SELECT position FROM checkpoints WHERE scan_id = ? AND fingerprint = ?",
+            (scan_id, fingerprint)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def save_checkpoint(self, scan_id: str, fingerprint: str, position: int) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO checkpoints (scan_id, fingerprint, position) VALUES (?, ?, ?)",
+            (scan_id, fingerprint, position)
+        )
+        self._conn.commit()
+
+    def clear_checkpoint(self, scan_id: str) -> None:
+        self._conn.execute("DELETE FROM checkpoints WHERE scan_id = ?", (scan_id,))
+        self._conn.commit()
+
+    def discard_stale(self, fingerprint: str) -> int:
+        """Deletes verdicts stored under any other fingerprint; returns the row count."""
+        cursor = self._conn.execute("DELETE FROM verdicts WHERE fingerprint != ?", (fingerprint,))
+        self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CorpusScan:
+    """
+    Iterates over (position, GuardrailResult) for a corpus, reusing stored verdicts.
+
+    With a `scan_id`, progress is checkpointed after every batch the caller has
+    consumed; re-running with the same ordered input resumes after the last
+    checkpoint. The checkpoint is cleared once the scan completes.
+    """
+
+    def __init__(
+        self,
+        engine,
+        texts: Iterable[str],
+        store: VerdictStore,
+        scan_id: Optional[str] = None,
+        batch_size: int = 500
+    ):
+        self.engine = engine
+        self.texts = texts
+        self.store = store
+        self.scan_id = scan_id
+        self.batch_size = batch_size
+        self.fingerprint = engine.fingerprint()
+        self.resumed_from = store.checkpoint(scan_id, self.fingerprint) if scan_id else 0
+        self.cached = 0
+        self.computed = 0
+
+    def __iter__(self) -> Iterator[Tuple[int, GuardrailResult]]:
+        batch: List[Tuple[int, str]] = []
+        for position, text in enumerate(self.texts):
+            if position < self.resumed_from:
+                continue
+            batch.append((position, text))
+            if len(batch) >= self.batch_size:
+                yield from self._run_batch(batch)
+                batch = []
+        if batch:
+            yield from self._run_batch(batch)
+        if self.scan_id:
+            self.store.clear_checkpoint(self.scan_id)
+
+    def _run_batch(self, batch: List[Tuple[int, str]]) -> Iterator[Tuple[int, GuardrailResult]]:
+        hashes = [VerdictStore.content_hash(text) for _, text in batch]
+        known = self.store.get_many(self.fingerprint, list(set(hashes)))
+
+        fresh: Dict[bytes, GuardrailResult] = {}
+        results = []
+        for (position, text), content_hash in zip(batch, hashes):
+            result = known.get(content_hash) or fresh.get(content_hash)
+            if result is None:
+                result = fresh[content_hash] = self.engine.validate_input(text)
+                self.computed += 1
+            else:
+                self.cached += 1
+            results.append((position, result))
+        if fresh:
+            self.store.put_many(self.fingerprint, fresh.items())
+
+        yield from results
+        if self.scan_id:
+            self.store.save_checkpoint(self.scan_id, self.fingerprint, batch[-1][0] + 1)
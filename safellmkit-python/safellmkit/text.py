@@ -0,0 +1,161 @@
+import hashlib
+import unicodedata
+from functools import cached_property
+from typing import Dict, List, Tuple, Union
+
+# Latin lookalikes (applied after NFKC + lowercasing) commonly used to dodge keyword rules
+CONFUSABLES = {
+    # Cyrillic
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o",
+    "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "ѕ": "s", "і": "i", "ї": "i",
+    "ј": "j", "ԁ": "d", "ɡ": "g", "һ": "h", "ԛ": "q", "ԝ": "w", "ү": "y",
+    # Greek
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v", "ο": "o",
+    "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "ω": "w",
+    # Latin variants that survive NFKC
+    "ı": "i", "ȷ": "j", "ł": "l", "ø": "o",
+}
+
+# Digit/symbol substitutions ("1gn0re", "@ct"); only applied to the `folded` form
+LEETSPEAK = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s",
+})
+
+_CLUSTER_CACHE: Dict[str, str] = {}
+_JOINS_CACHE: Dict[Tuple[str, str], bool] = {}
+
+
+def _joins(cluster: str, ch: str) -> bool:
+    """True when NFKC would compose `ch` with the run before it."""
+    if ch.isascii():
+        return False
+    if unicodedata.combining(ch):
+        return True
+    # A few starters still compose (Hangul jamo, some Indic vowel signs)
+    if len(cluster) == 1:
+        joins = _JOINS_CACHE.get((cluster, ch))
+        if joins is not None:
+            return joins
+    nfkc = unicodedata.normalize
+    joins = nfkc("NFKC", cluster + ch) != nfkc("NFKC", cluster) + nfkc("NFKC", ch)
+    if len(cluster) == 1 and len(_JOINS_CACHE) < 65536:
+        _JOINS_CACHE[(cluster, ch)] = joins
+    return joins
+
+
+def _clusters(text: str) -> List[Tuple[int, int]]:
+    """[start, end) spans of `text` that NFKC normalizes independently of each other."""
+    spans = []
+    start = 0
+    for i in range(1, len(text)):
+        if not _joins(text[start:i], text[i]):
+            spans.append((start, i))
+            start = i
+    if text:
+        spans.append((start, len(text)))
+    return spans
+
+
+def _normalize_cluster(cluster: str) -> str:
+    piece = _CLUSTER_CACHE.get(cluster)
+    if piece is None:
+        out = []
+        for c in unicodedata.normalize("NFKC", cluster).lower():
+            # Drop zero-width and other invisible format characters
+            if unicodedata.category(c) == "Cf":
+                continue
+            out.append(CONFUSABLES.get(c, c))
+        piece = "".join(out)
+        if len(_CLUSTER_CACHE) < 65536:
+            _CLUSTER_CACHE[cluster] = piece
+    return piece
+
+
+def normalize(text: str) -> str:
+    """NFKC + lowercase + confusables folded + zero-width characters stripped."""
+    if text.isascii():
+        return text.lower()
+    # Combining sequences are normalized as a unit so they compose ("e\u0301" -> "é")
+    return "".join(_normalize_cluster(text[start:end]) for start, end in _clusters(text))
+
+
+def fold(text: str) -> str:
+    """normalize() plus leetspeak folding; use it to compile patterns matched against `folded`."""
+    return normalize(text).translate(LEETSPEAK)
+
+
+class TextView:
+    """
+    One normalized view of a request, built once and shared by every rule and the
+    tokenizer. `normalized` and `folded` have identical lengths; `to_original()` maps
+    their offsets back onto `text`.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.normalized = normalize(text)
+
+    @cached_property
+    def folded(self) -> str:
+        return self.normalized.translate(LEETSPEAK)
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        return self.folded.split()
+
+    @cached_property
+    def token_set(self) -> frozenset:
+        return frozenset(self.tokens)
+
+    @cached_property
+    def is_identity(self) -> bool:
+        """True when normalized offsets equal original offsets (ASCII input)."""
+        return len(self.normalized) == len(self.text) and self.text.isascii()
+
+    @cached_property
+    def offsets(self) -> List[int]:
+        # offsets[i] = index in `text` where the run that produced normalized[i] starts;
+        # the trailing sentinel maps end-of-string
+        if self.is_identity:
+            return list(range(len(self.text) + 1))
+        return self._spans[0]
+
+    @cached_property
+    def _spans(self) -> Tuple[List[int], List[int]]:
+        starts: List[int] = []
+        ends: List[int] = []
+        for start, end in _clusters(self.text):
+            width = len(_normalize_cluster(self.text[start:end]))
+            starts.extend([start] * width)
+            ends.extend([end] * width)
+        starts.append(len(self.text))
+        return starts, ends
+
+    def to_original(self, start: int, end: int) -> Tuple[int, int]:
+        """Maps a [start, end) span of `normalized`/`folded` onto `text`."""
+        if start < 0 or self.is_identity:
+            return start, end
+        offsets = self.offsets
+        if end <= start:
+            return offsets[start], offsets[start]
+        # The end maps to just past the last source run, combining marks included
+        return offsets[start], self._spans[1][end - 1]
+
+    def form(self, name: str) -> str:
+        return getattr(self, name)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+
+def fingerprint() -> str:
+    """Hash of the normalization tables; part of the engine fingerprint."""
+    payload = repr((sorted(CONFUSABLES.items()), sorted(LEETSPEAK.items()), unicodedata.unidata_version))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def as_view(text: Union[str, TextView]) -> TextView:
+    return text if isinstance(text, TextView) else TextView(text)
@@ -0,0 +1,93 @@
+import re
+from typing import Dict, Iterable, Iterator, Tuple
+
+_PLACEHOLDER = re.compile(r"\[[A-Z]+_\d+\]")
+# A placeholder cut off by the end of a chunk: "[", "[EMA", "[EMAIL_", "[EMAIL_1"
+_PARTIAL = re.compile(r"\[[A-Z]*(?:_\d*)?$")
+
+
+class PseudonymVault:
+    """
+    Per-request (or per-conversation) mapping between PII values and stable
+    placeholders: each distinct value of a kind gets the next `[KIND_n]`, and the
+    same value always gets the same placeholder. Both directions are dict lookups.
+    Memory is bounded by `max_entities`; values seen after that are redacted as
+    `[KIND_REDACTED]` and cannot be restored.
+    """
+
+    def __init__(self, max_entities: int = 1000):
+        self.max_entities = max_entities
+        self._placeholders: Dict[Tuple[str, str], str] = {}
+        self._originals: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+        self.overflowed = 0
+
+    def __len__(self) -> int:
+        return len(self._originals)
+
+    @property
+    def max_placeholder_length(self) -> int:
+        longest_kind = max((len(k) for k in self._counts), default=0)
+        return len(f"[{'X' * longest_kind}_{self.max_entities}]")
+
+    def placeholder(self, kind: str, value: str) -> str:
+        """The placeholder for `value` of `kind` (e.g. "EMAIL"), issuing one if new."""
+        key = (kind, value)
+        existing = self._placeholders.get(key)
+        if existing is not None:
+            return existing
+        if len(self._originals) >= self.max_entities:
+            self.overflowed += 1
+            return f"[{kind}_REDACTED]"
+        count = self._counts.get(kind, 0) + 1
+        self._counts[kind] = count
+        placeholder = f"[{kind}_{count}]"
+        self._placeholders[key] = placeholder
+        self._originals[placeholder] = value
+        return placeholder
+
+    def original(self, placeholder: str) -> str:
+        """The value behind `placeholder`, or the placeholder itself if unknown."""
+        return self._originals.get(placeholder, placeholder)
+
+    def restore(self, text: str) -> str:
+        """Replaces every known placeholder in `text` with its original value."""
+        if not self._originals or "[" not in text:
+            return text
+        return _PLACEHOLDER.sub(lambda m: self._originals.get(m.group(), m.group()), text)
+
+    def restorer(self) -> "PseudonymRestorer":
+        return PseudonymRestorer(self)
+
+
+class PseudonymRestorer:
+    """
+    Streaming de-pseudonymizer for model output: feed() chunks as they arrive and
+    emit what it returns. Only a trailing partial placeholder (a few characters) is
+    held back until the next chunk, so each character is scanned about once.
+    """
+
+    def __init__(self, vault: PseudonymVault):
+        self.vault = vault
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        text = self._pending + chunk
+        tail = _PARTIAL.search(text, max(0, len(text) - self.vault.max_placeholder_length))
+        cut = tail.start() if tail else len(text)
+        self._pending = text[cut:]
+        return self.vault.restore(text[:cut])
+
+    def flush(self) -> str:
+        text, self._pending = self._pending, ""
+        return self.vault.restore(text)
+
+    def stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Restores an iterable of chunks, e.g. a streamed completion."""
+        for chunk in chunks:
+            restored = self.feed(chunk)
+            if restored:
+                yield restored
+        rest = self.flush()
+        if rest:
+            yield rest
@@ -0,0 +1,51 @@
+import json
+import numpy as np
+from safellmkit import GuardrailsEngine, Policy, GuardrailAction
+from safellmkit.calibration import ThresholdCurve, calibrate, load_labeled_csv, score_texts, write_policy
+from safellmkit.engine import StrictPolicy
+
+def test_curve_matches_bruteforce_sweep():
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 2, 500).astype(np.int8)
+    probs = np.clip(rng.normal(0.35 + 0.3 * labels, 0.15), 0, 1).round(2).astype(np.float32)
+    curve = ThresholdCurve(probs, labels)
+    for i in (0, len(curve.thresholds) // 2, len(curve.thresholds) - 1):
+        t = curve.thresholds[i]
+        predicted = probs >= t
+        assert curve.tp[i] == int((predicted & (labels == 1)).sum())
+        assert curve.fp[i] == int((predicted & (labels == 0)).sum())
+
+    report = calibrate(probs, labels, block_fpr=0.01, sanitize_fpr=0.1)
+    assert report["block"]["fpr"] <= 0.01 and report["sanitize"]["fpr"] <= 0.1
+    assert report["ml_thresholds"]["sanitize"] <= report["ml_thresholds"]["block"]
+    assert 0.5 < report["roc_auc"] <= 1.0
+
+class CountingClassifier:
+    calls = 0
+    def predict(self, text):
+        return False, 0.9 if "attack" in str(text) else 0.1
+    def predict_batch(self, texts):
+        CountingClassifier.calls += 1
+        return np.asarray([self.predict(t)[1] for t in texts], dtype=np.float32)
+
+def test_calibrated_policy_is_used_by_engine(tmp_path):
+    csv_path = tmp_path / "labeled.csv"
+    csv_path.write_text("prompt,label\nhello,0\nattack now,1\nweather,safe\nattack plan,jailbreak\n")
+    texts, labels = load_labeled_csv(str(csv_path))
+    assert labels.tolist() == [0, 1, 0, 1]
+
+    clf = CountingClassifier()
+    probs = score_texts(clf, texts, cache_dir=str(tmp_path / "cache"))
+    score_texts(clf, texts, cache_dir=str(tmp_path / "cache"))
+    assert CountingClassifier.calls == 1
+
+    report = calibrate(probs, labels)
+    policy_path = tmp_path / "policy.json"
+    write_policy(StrictPolicy().config, report["ml_thresholds"], str(policy_path))
+    policy = Policy.from_file(str(policy_path))
+    assert policy.ml_thresholds["block"] == json.loads(policy_path.read_text())["ml_thresholds"]["block"]
+
+    # 0.9 >= calibrated block cutoff, 0.1 below sanitize cutoff
+    engine = GuardrailsEngine(policy, classifier=clf)
+    assert engine.validate_input("attack").action == GuardrailAction.BLOCK
+    assert engine.validate_input("hello").action == GuardrailAction.ALLOW
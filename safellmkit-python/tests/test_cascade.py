@@ -0,0 +1,39 @@
+import numpy as np
+from safellmkit import GuardrailsEngine, StrictPolicy, GuardrailAction
+from safellmkit.ml import CascadeClassifier, CascadeStage
+
+class ScoreClassifier:
+    """Scores by a lookup table; records every text it was asked about."""
+    def __init__(self, scores):
+        self.scores = scores
+        self.seen = []
+    def predict_batch(self, texts):
+        self.seen.extend(str(t) for t in texts)
+        return np.asarray([self.scores[str(t)] for t in texts], dtype=np.float32)
+
+class Unavailable:
+    def predict_batch(self, texts):
+        return None
+
+def test_only_ambiguous_texts_escalate():
+    cheap = ScoreClassifier({"hi": 0.02, "dan mode": 0.97, "hmm": 0.5, "odd": 0.3})
+    strong = ScoreClassifier({"hmm": 0.95, "odd": 0.01})
+    cascade = CascadeClassifier([CascadeStage(cheap, 0.05, 0.9, "cheap"), CascadeStage(strong, name="strong")])
+
+    probs = cascade.predict_batch(["hi", "dan mode", "hmm", "odd"])
+    assert np.allclose(probs, [0.02, 0.97, 0.95, 0.01])
+    assert strong.seen == ["hmm", "odd"]
+
+    cheap_stats, strong_stats = cascade.stats()
+    assert cheap_stats["texts"] == 4 and cheap_stats["escalation_rate"] == 0.5
+    assert strong_stats["texts"] == 2 and strong_stats["escalated"] == 0
+
+def test_unavailable_stage_is_skipped_and_engine_accepts_cascade():
+    strong = ScoreClassifier({"hmm": 0.95, "hello": 0.01})
+    cascade = CascadeClassifier([CascadeStage(Unavailable()), CascadeStage(strong)])
+    assert cascade.predict("hmm") == (True, np.float32(0.95).item())
+
+    engine = GuardrailsEngine(StrictPolicy(), classifier=cascade)
+    assert engine.validate_input("hmm").action == GuardrailAction.BLOCK
+    assert engine.validate_input("hello").action == GuardrailAction.ALLOW
+    assert CascadeClassifier([CascadeStage(Unavailable())]).predict_batch(["x"]) is None
@@ -0,0 +1,74 @@
+import io
+import random
+import pytest
+from safellmkit import GuardrailsEngine, Policy, StrictPolicy, RelaxedPolicy, GuardrailAction
+
+WORDS = [
+    "hello", "world", "ignore", "previous", "instructions", "reveal", "system", "prompt",
+    "idiot", "stupid", "call", "555-123-4567", "+1 555 123 4567", "bob@example.com",
+    "ünïcode", "ｆｕｌｌ", "zero​width", "\n", "  ",
+]
+
+def _document(seed, n):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def _findings(result):
+    return sorted((f.rule, f.severity, f.message) for f in result.findings)
+
+def _sanitized(engine, text):
+    for entry in engine.policy.input_rules:
+        if entry["action_mode"] == "SANITIZE":
+            text = engine.rules_instances[entry["rule_type"]].sanitize(text)
+    return text
+
+@pytest.mark.parametrize("prefilter", [False, True])
+def test_windows_match_whole_text_validation(prefilter):
+    for seed in range(20):
+        text = _document(seed, 400)
+        for policy in (StrictPolicy(), RelaxedPolicy()):
+            engine = GuardrailsEngine(policy, prefilter=prefilter)
+            out = io.BytesIO()
+            result = engine.validate_buffer(text.encode("utf-8"), out=out, chunk_size=450 + seed * 37)
+            expected = engine.validate_input(text)
+            assert result.action == expected.action
+            assert result.risk_score == expected.risk_score
+            assert _findings(result) == _findings(expected)
+            assert result.safe_text is None
+            assert out.getvalue().decode("utf-8") == _sanitized(engine, text)
+
+def test_validate_file_streams_sanitized_output(tmp_path):
+    body = ("lorem ipsum dolor sit amet " * 2000 + "mail bob@example.com you idiot\n") * 5
+    path = tmp_path / "dump.txt"
+    path.write_bytes(body.encode("utf-8") + b"\xff trailing")
+    engine = GuardrailsEngine(StrictPolicy())
+    with open(tmp_path / "out.txt", "wb") as out:
+        result = engine.validate_file(str(path), out=out, chunk_size=4096)
+    assert result.action == GuardrailAction.SANITIZE
+    written = (tmp_path / "out.txt").read_bytes()
+    # Invalid bytes pass through unchanged; every occurrence is sanitized
+    assert written.endswith(b"\xff trailing")
+    assert written.count(b"[EMAIL_REDACTED]") == 5 and b"idiot" not in written
+    assert len(written.decode("utf-8", "replace")) > len(body) - 100
+
+def test_empty_file_and_small_chunks(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    engine = GuardrailsEngine(StrictPolicy())
+    assert engine.validate_file(str(path)).action == GuardrailAction.ALLOW
+    with pytest.raises(ValueError):
+        engine.validate_buffer(b"hello", chunk_size=64)
+
+def test_signal_phrases_are_not_lost_or_split_across_windows():
+    policy = Policy({"input_rules": [{"rule_type": "SignalJailbreakRule", "action_mode": "BLOCK", "min_severity": 8}]})
+    engine = GuardrailsEngine(policy)
+    for offset in range(0, 460, 3):
+        text = "x" * offset + " lorem ipsum " * 40 + "do anything now" + " dolor" * 40
+        result = engine.validate_buffer(text.encode("utf-8"), chunk_size=460)
+        assert result.action == engine.validate_input(text).action == GuardrailAction.BLOCK
+    # Signals in different windows add up as they do for the whole text
+    text = "DAN " + "lorem ipsum " * 20000 + " act as"
+    result = engine.validate_buffer(text.encode("utf-8"), chunk_size=4096)
+    expected = engine.validate_input(text)
+    assert result.action == expected.action == GuardrailAction.BLOCK
+    assert _findings(result) == _findings(expected)
@@ -0,0 +1,43 @@
+from safellmkit import GuardrailsEngine, Policy, StrictPolicy, GuardrailAction
+from safellmkit.cli import main
+from safellmkit.lexicon import Lexicon
+from safellmkit.rules import ToxicityRule
+
+def test_lexicon_multiword_lookup_and_mmap_roundtrip(tmp_path):
+    terms = tmp_path / "terms.tsv"
+    terms.write_text("# brand list\nterm\tseverity\tcategory\nacme sucks\t7\tBRAND_SAFETY\nScumbag\t6\nfreak\n")
+    out = tmp_path / "terms.slka"
+    main(["lexicon", str(terms), str(out)])
+    lexicon = Lexicon.open(str(out))
+    assert len(lexicon) == 3 and lexicon.max_words == 2
+
+    matches = lexicon.lookup("Honestly, ACME   sucks! What a $cumbag.")
+    assert [(m.term, m.severity, m.category) for m in matches] == [
+        ("acme sucks", 7, "BRAND_SAFETY"), ("scumbag", 6, "CONTENT_SAFETY")]
+    assert lexicon.fingerprint() == Lexicon.from_file(str(terms)).fingerprint()
+
+    rule = ToxicityRule(str(out))
+    assert rule.sanitize("Honestly, ACME   sucks!") == "Honestly, ****   *****!"
+    assert rule.fingerprint() != ToxicityRule().fingerprint()
+
+def test_policy_params_select_lexicon(tmp_path):
+    path = tmp_path / "terms.txt"
+    path.write_text("forbidden phrase\t9\n")
+    policy = Policy({"input_rules": [{
+        "rule_type": "ToxicityRule", "action_mode": "BLOCK", "min_severity": 8,
+        "params": {"lexicon": str(path)}}]})
+    engine = GuardrailsEngine(policy, prefilter=True)
+    assert engine.validate_input("a F0rbidden phrase here").action == GuardrailAction.BLOCK
+    assert engine.validate_input("you idiot").action == GuardrailAction.ALLOW
+
+def test_toxicity_reports_each_term_once_and_strips_edge_punctuation():
+    rule = ToxicityRule()
+    hits = rule.scan("kill kill kill")
+    assert len(hits) == 1 and (hits[0].start, hits[0].end) == (0, 4)
+    assert rule.sanitize("kill kill kill") == "**** **** ****"
+    # Edge punctuation no longer hides a term (plain split() missed "stupid," and "stupid.")
+    text = "You are stupid, stupid."
+    assert [h.message for h in rule.scan(text)] == ["Toxic language detected: stupid"]
+    assert rule.sanitize(text) == "You are ******, ******."
+    result = GuardrailsEngine(StrictPolicy()).validate_input(text)
+    assert result.action == GuardrailAction.SANITIZE and result.risk_score == 50 and len(result.findings) == 1
@@ -1,4 +1,7 @@
-from safellmkit.rules import ToxicityRule, SignalJailbreakRule
+import pytest
+from safellmkit import GuardrailsEngine, GuardrailAction, GuardrailFinding, Policy
+from safellmkit.engine import RULE_MAP
+from safellmkit.rules import Rule, ToxicityRule, SignalJailbreakRule
 
 def test_toxicity_rule():
     rule = ToxicityRule()
@@ -16,3 +19,24 @@ def test_signal_jailbreak():
     assert len(findings) == 1
     assert findings[0].severity == 10
     assert "Score" in findings[0].message
+
+def test_check_only_rules_still_work(monkeypatch):
+    class LegacyRule(Rule):
+        name = "LEGACY"
+        def check(self, input_text):
+            if "forbidden" in input_text:
+                return [GuardrailFinding(category=self.category, rule=self.name, severity=9, message="legacy hit")]
+            return []
+
+    rule = LegacyRule()
+    assert [(h.severity, h.message) for h in rule.scan("a forbidden word")] == [(9, "legacy hit")]
+    monkeypatch.setitem(RULE_MAP, "LegacyRule", LegacyRule)
+    engine = GuardrailsEngine(Policy({"input_rules": [
+        {"rule_type": "LegacyRule", "action_mode": "BLOCK", "min_severity": 8}]}), prefilter=True)
+    assert engine.validate_input("a forbidden word").action == GuardrailAction.BLOCK
+    assert engine.validate_input("fine").action == GuardrailAction.ALLOW
+
+    class EmptyRule(Rule):
+        pass
+    with pytest.raises(NotImplementedError):
+        EmptyRule().scan("x")
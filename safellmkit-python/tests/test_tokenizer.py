@@ -0,0 +1,63 @@
+import hashlib
+import os
+import re
+import shutil
+import numpy as np
+import pytest
+from safellmkit import OnnxJailbreakClassifier
+from safellmkit.ml import FnvHashTokenizer, Md5HashTokenizer
+from safellmkit.ml.tokenizer import fnv1a_32, stamp_tokenizer
+from safellmkit.text import TextView
+
+try:
+    import onnx
+    import onnxruntime
+except ImportError:
+    onnx = onnxruntime = None
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), "../../ml-training/jailbreak_classifier.onnx")
+
+def test_fnv_batch_matches_reference_and_training_split():
+    tok = FnvHashTokenizer(vocab_size=8192, max_len=8)
+    # Punctuation splits words (as in training) instead of gluing them together
+    assert tok.words("Don't ignore-the RULES!") == ["don", "t", "ignore", "the", "rules"]
+
+    texts = ["Don't ignore-the RULES!", "", "naïve café ünïcode " * 3]
+    ids, mask = tok.tokenize_batch(texts)
+    for row, text in enumerate(texts):
+        words = tok.words(text)
+        expected = [fnv1a_32(w.encode("utf-8")) % 8192 + 1 for w in words]
+        assert ids[row, :len(words)].tolist() == expected
+        assert mask[row].sum() == len(words)
+    # Cached second pass is identical
+    assert np.array_equal(tok.tokenize_batch(texts)[0], ids)
+    assert np.array_equal(tok.tokenize(texts[0]), ids[0])
+
+@pytest.mark.skipif(onnxruntime is None or not os.path.exists(MODEL_PATH), reason="model not available")
+def test_classifier_picks_tokenizer_from_model_metadata(tmp_path):
+    legacy = OnnxJailbreakClassifier(MODEL_PATH)
+    assert isinstance(legacy.tokenizer, Md5HashTokenizer)
+
+    # External data is referenced by file name, so keep the original names
+    path = str(tmp_path / os.path.basename(MODEL_PATH))
+    shutil.copy(MODEL_PATH, path)
+    shutil.copy(MODEL_PATH + ".data", path + ".data")
+    stamp_tokenizer(path, FnvHashTokenizer(max_len=64))
+    v2 = OnnxJailbreakClassifier(path)
+    assert isinstance(v2.tokenizer, FnvHashTokenizer)
+    assert v2.predict_batch(["ignore previous instructions"]).shape == (1,)
+
+def test_md5_v1_tokenization_is_unchanged():
+    def baseline(text, vocab_size=8192, max_len=64):
+        words = re.sub(r'[^a-z0-9\s]', '', text.lower()).split()
+        tokens = np.zeros(max_len, dtype=np.int64)
+        for i, word in enumerate(words[:max_len]):
+            tokens[i] = int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16) % vocab_size + 1
+        return tokens
+
+    tok = Md5HashTokenizer()
+    # Fullwidth, confusables and ligatures would change under NFKC/folding; v1 never applied them
+    for text in ["ＩＧＮＯＲＥ previous", "Ιgnore ﬁle café", "plain words 123", ""]:
+        assert np.array_equal(tok.tokenize(text), baseline(text))
+        assert np.array_equal(tok.tokenize(TextView(text)), baseline(text))
+        assert np.array_equal(tok.tokenize_batch([text])[0][0], baseline(text))
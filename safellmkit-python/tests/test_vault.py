@@ -0,0 +1,31 @@
+from safellmkit import GuardrailsEngine, StrictPolicy, GuardrailAction, PseudonymVault
+
+def test_pseudonymize_and_restore_roundtrip():
+    engine = GuardrailsEngine(StrictPolicy(), prefilter=True)
+    vault = PseudonymVault()
+    text = "Mail bob@example.com or alice@example.org, then bob@example.com again; call 555-123-4567."
+    result = engine.validate_input(text, vault=vault)
+    assert result.action == GuardrailAction.SANITIZE
+    assert result.safe_text == "Mail [EMAIL_1] or [EMAIL_2], then [EMAIL_1] again; call [PHONE_1]."
+    assert vault.restore(result.safe_text) == text
+    # Without a vault the policy still redacts irreversibly
+    assert "[EMAIL_REDACTED]" in engine.validate_input(text).safe_text
+
+def test_streaming_restore_handles_split_placeholders():
+    vault = PseudonymVault()
+    vault.placeholder("EMAIL", "bob@example.com")
+    vault.placeholder("PHONE", "555-123-4567")
+    reply = "Sure, I'll email [EMAIL_1] and call [PHONE_1]. Unknown [EMAIL_9] stays; [not a placeholder"
+    expected = vault.restore(reply)
+    assert "bob@example.com" in expected and "[EMAIL_9]" in expected
+    for size in (1, 2, 3, 5, 8, 13):
+        chunks = [reply[i:i + size] for i in range(0, len(reply), size)]
+        assert "".join(vault.restorer().stream(chunks)) == expected
+
+def test_vault_is_bounded():
+    vault = PseudonymVault(max_entities=2)
+    assert vault.placeholder("EMAIL", "a@x.io") == "[EMAIL_1]"
+    assert vault.placeholder("PHONE", "555-000-1111") == "[PHONE_1]"
+    assert vault.placeholder("EMAIL", "b@x.io") == "[EMAIL_REDACTED]"
+    assert vault.placeholder("EMAIL", "a@x.io") == "[EMAIL_1]"
+    assert len(vault) == 2 and vault.overflowed == 1